@@ -1,38 +1,147 @@
 import asyncio
+import heapq
 import logging
+import time
+from collections import OrderedDict, defaultdict, deque
+from itertools import islice
+from types import MappingProxyType
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, Iterator, List, Mapping, NamedTuple, Optional, Any, Set, Union
 from uuid import UUID, uuid4
-import json
+
+import orjson
 
 from ..schemas.agents import AgentDefinition, AgentStatus, AgentMetrics, AgentCapabilities, AgentState, AgentType
 from ..schemas.messages import Message, MessageHeader, MessageType, MessagePriority, LogMessage, ErrorMessage, CommandMessage, ResponseMessage, BroadcastMessage
 from ..schemas.crews import CrewDefinition, CrewMember, CrewRole
 from ..base_agent import BaseAgent
 
+# Upper bound on the number of log entries retained per level
+MAX_PER_LEVEL = 100000
+
+# Log levels that are forwarded to the agent logger
+_LEVELS = frozenset(('debug', 'info', 'warning', 'error', 'critical'))
+
+# Numeric values of the forwarded log levels
+_LEVEL_INT = {
+    'debug': logging.DEBUG,
+    'info': logging.INFO,
+    'warning': logging.WARNING,
+    'error': logging.ERROR,
+    'critical': logging.CRITICAL
+}
+
+# Level names accepted by the set_log_level command
+_VALID_LEVELS = frozenset({'DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'})
+
+# Shared default for payloads without a context; read-only so it cannot be mutated
+_EMPTY_CONTEXT: Mapping[str, Any] = MappingProxyType({})
+
+# Upper bound on the number of log entries indexed per source and level
+MAX_PER_SOURCE = 10000
+
+# Upper bound on the number of sources in the source index; least recently
+# logging sources are dropped first and their queries fall back to a scan
+MAX_INDEXED_SOURCES = 1024
+
+# Maximum number of queued records the ingest worker handles per wakeup
+INGEST_BATCH_SIZE = 256
+
+# Only one in this many ingest errors is logged with a full traceback
+TRACEBACK_SAMPLE_RATE = 100
+
+# Approximate fixed per-entry overhead (dict, keys, timestamp) in bytes
+LOG_ENTRY_OVERHEAD_BYTES = 128
+
+# Approximate size of one context item in bytes
+CONTEXT_ITEM_BYTES = 64
+
+# Approximate cost of a record's slot in the source index in bytes
+INDEX_ENTRY_BYTES = 8
+
+class LogRecord(NamedTuple):
+    """Compact in-memory representation of a stored log entry"""
+    ts: float  # Epoch seconds, used for retention checks
+    timestamp: str  # ISO-8601, as reported to clients
+    level: str
+    message: str
+    source: str
+    agent_id: str
+    context: Mapping[str, Any]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the record to the dictionary shape returned to clients"""
+        return {
+            'timestamp': self.timestamp,
+            'level': self.level,
+            'message': self.message,
+            'source': self.source,
+            'agent_id': self.agent_id,
+            'context': dict(self.context)  # a copy, so callers cannot alter the stored record
+        }
+
+def _entry_size(record: LogRecord) -> int:
+    """Estimate the resident size of a stored log record in bytes"""
+    return (len(record.message) + len(record.source) + len(record.context) * CONTEXT_ITEM_BYTES
+            + LOG_ENTRY_OVERHEAD_BYTES + INDEX_ENTRY_BYTES)
+
 class LoggerAgent(BaseAgent):
     """Specialized agent for logging and monitoring other agents"""
     
-    def __init__(self, agent_definition: Optional[AgentDefinition] = None):
-        """Initialize the logger agent"""
+    _EXTRA_HANDLERS = {
+        MessageType.LOG: '_handle_log_message',
+        MessageType.ERROR: '_handle_error_message',
+        MessageType.COMMAND: '_handle_command',
+        MessageType.STATUS_UPDATE: '_handle_status_update',
+        MessageType.ALERT: '_handle_alert'
+    }
+    
+    def __init__(self, agent_definition: Optional[AgentDefinition] = None, log_file_path: Optional[str] = None):
+        """Initialize the logger agent
+        
+        Args:
+            agent_definition: Agent definition, a default one is created if omitted
+            log_file_path: Optional NDJSON file that each flush is appended to
+        """
         if agent_definition is None:
             agent_definition = self._create_default_definition()
         
         super().__init__(agent_definition)
-        self.log_buffer: List[Dict[str, Any]] = []
-        self.max_buffer_size = 1000
-        self.last_flush = datetime.utcnow()
-        self.flush_interval = 60  # seconds
-        self.log_storage: Dict[str, List[Dict[str, Any]]] = {
-            'debug': [],
-            'info': [],
-            'warning': [],
-            'error': [],
-            'critical': []
+        self.log_file_path = log_file_path
+        self._log_by_level = {level: getattr(self.logger, level) for level in _LEVELS}
+        self._min_level = self.logger.getEffectiveLevel()
+        # Reused for every forwarded record; logging copies extra into the LogRecord
+        self._forward_extra: Dict[str, Any] = {"context": None}
+        config = self.definition.config
+        self.max_buffer_size = config.log_buffer_max_entries
+        self.max_buffer_bytes = config.log_buffer_max_bytes
+        self.log_buffer: deque = deque(maxlen=self.max_buffer_size)
+        self._buffer_bytes = 0  # Running estimate of log_buffer size
+        # Handlers enqueue (record, is_error) pairs; _ingest_worker buffers and logs them
+        self._ingest_q: asyncio.Queue = asyncio.Queue(maxsize=self.max_buffer_size)
+        self._ingest_task: Optional[asyncio.Task] = None
+        self._ack_tasks: Set[asyncio.Task] = set()  # Keeps pending acks referenced
+        self._last_flush_mono = time.monotonic()
+        self._last_rate_mono: Optional[float] = None
+        self.flush_interval = config.log_flush_interval_seconds
+        self.log_storage: Dict[str, deque] = {
+            'debug': deque(maxlen=MAX_PER_LEVEL),
+            'info': deque(maxlen=MAX_PER_LEVEL),
+            'warning': deque(maxlen=MAX_PER_LEVEL),
+            'error': deque(maxlen=MAX_PER_LEVEL),
+            'critical': deque(maxlen=MAX_PER_LEVEL)
         }
+        self._storage_bytes = 0  # Running estimate of log_storage size
+        # Secondary index over log_storage for source-filtered queries: source ->
+        # level -> records, holding only records still in log_storage
+        self._by_source: "OrderedDict[str, Dict[str, deque]]" = OrderedDict()
+        self._source_index_complete = True  # False once a source has been dropped
+        # Sources indexed after a drop, whose older records may be missing from the index
+        self._partial_sources: Set[str] = set()
         self.metrics = {
             'logs_processed': 0,
             'log_ingest_errors': 0,
+            'dropped_logs': 0,
             'last_ingest_time': None,
             'ingest_rate': 0.0,
             'log_level_distribution': {level: 0 for level in self.log_storage.keys()}
@@ -98,15 +207,82 @@ class LoggerAgent(BaseAgent):
             state=state
         )
     
-    def _register_message_handlers(self) -> Dict[str, Any]:
-        """Register message handlers specific to the logger agent"""
-        return {
-            MessageType.LOG: self._handle_log_message,
-            MessageType.ERROR: self._handle_error_message,
-            MessageType.COMMAND: self._handle_command,
-            MessageType.STATUS_UPDATE: self._handle_status_update,
-            MessageType.ALERT: self._handle_alert
-        }
+    async def start(self):
+        """Start the agent and its log ingest worker"""
+        await super().start()
+        if self._ingest_task is None or self._ingest_task.done():
+            self._ingest_task = asyncio.create_task(self._ingest_worker())
+    
+    async def stop(self):
+        """Stop the ingest worker, then the agent"""
+        if self._ingest_task and not self._ingest_task.done():
+            self._ingest_task.cancel()
+            try:
+                await self._ingest_task
+            except asyncio.CancelledError:
+                pass
+        self._drain_ingest_queue()
+        await super().stop()
+    
+    async def _ingest_worker(self):
+        """Move queued records into the buffer in batches"""
+        try:
+            while True:
+                item = await self._ingest_q.get()
+                self._ingest_batch([item] + self._get_queued(INGEST_BATCH_SIZE - 1))
+        except asyncio.CancelledError:
+            self.logger.info("Log ingest worker cancelled")
+    
+    def _get_queued(self, limit: Optional[int] = None) -> List[Any]:
+        """Take up to ``limit`` items from the ingest queue without waiting"""
+        items = []
+        while not self._ingest_q.empty() and (limit is None or len(items) < limit):
+            items.append(self._ingest_q.get_nowait())
+        return items
+    
+    def _drain_ingest_queue(self):
+        """Synchronously ingest everything currently queued"""
+        items = self._get_queued()
+        if items:
+            self._ingest_batch(items)
+    
+    def _ingest_batch(self, items: List[Any]):
+        """Buffer a batch of queued records and forward them to the agent logger"""
+        # The ring buffer drops the oldest entries when the batch overflows it
+        maxlen = self.log_buffer.maxlen
+        overflow = len(self.log_buffer) + len(items) - maxlen
+        if overflow > 0:
+            self.metrics['dropped_logs'] += overflow
+            self._buffer_bytes -= sum(_entry_size(r) for r in islice(self.log_buffer, min(overflow, len(self.log_buffer))))
+        self.log_buffer.extend(record for record, _ in items)
+        # A batch larger than the buffer only keeps its newest maxlen records
+        kept = items if len(items) <= maxlen else items[-maxlen:]
+        self._buffer_bytes += sum(_entry_size(record) for record, _ in kept)
+        
+        extra = self._forward_extra
+        for record, is_error in items:
+            extra["context"] = record.context
+            if is_error:
+                self.logger.error(record.message, extra=extra)
+                continue
+            log_method = self._log_by_level.get(record.level.lower())
+            if log_method is not None:
+                log_method(f"[{record.source}] {record.message}", extra=extra)
+        extra["context"] = None
+    
+    def _log_ingest_error(self, msg: str, error: Exception):
+        """Count an ingest error, attaching a traceback to a sample of them"""
+        self.metrics['log_ingest_errors'] += 1
+        # The first error and then every Nth one carry the traceback
+        with_traceback = self.metrics['log_ingest_errors'] % TRACEBACK_SAMPLE_RATE == 1
+        self.logger.error(msg, error, exc_info=with_traceback)
+    
+    def _enqueue_log(self, record: LogRecord, is_error: bool = False):
+        """Hand a record to the ingest worker, dropping it if the queue is full"""
+        try:
+            self._ingest_q.put_nowait((record, is_error))
+        except asyncio.QueueFull:
+            self.metrics['dropped_logs'] += 1
     
     async def _do_background_work(self):
         """Perform background work like flushing logs and cleaning up"""
@@ -115,132 +291,253 @@ class LoggerAgent(BaseAgent):
         await self._update_metrics()
     
     async def _flush_logs_if_needed(self):
-        """Flush logs if buffer is full or enough time has passed"""
-        now = datetime.utcnow()
-        if (len(self.log_buffer) >= self.max_buffer_size or 
-            (now - self.last_flush).total_seconds() >= self.flush_interval):
+        """Flush logs when the buffer reaches its entry or byte limit, or is old enough"""
+        if (len(self.log_buffer) >= self.max_buffer_size or
+            self._buffer_bytes >= self.max_buffer_bytes or
+            time.monotonic() - self._last_flush_mono >= self.flush_interval):
             await self._flush_logs()
     
-    async def _flush_logs(self):
-        """Flush buffered logs to storage"""
+    async def _flush_logs(self) -> int:
+        """Flush buffered logs to storage, returning the number flushed"""
+        self._drain_ingest_queue()
         if not self.log_buffer:
-            return
+            return 0
         
         try:
-            # In a real implementation, this would write to a database
-            for log_entry in self.log_buffer:
-                level = log_entry.get('level', 'info').lower()
+            # Group entries by level so storage is written once per level
+            flushed = len(self.log_buffer)
+            groups: Dict[str, List[LogRecord]] = defaultdict(list)
+            while self.log_buffer:
+                record = self.log_buffer.popleft()
+                groups[record.level.lower()].append(record)
+            self._buffer_bytes = 0
+            
+            for level, group in groups.items():
                 if level in self.log_storage:
-                    self.log_storage[level].append(log_entry)
-                    self.metrics['log_level_distribution'][level] += 1
+                    logs = self.log_storage[level]
+                    self.metrics['log_level_distribution'][level] += len(group)
+                    kept = group if len(group) <= logs.maxlen else group[-logs.maxlen:]
+                    # Account for entries the bounded deque evicts on extend
+                    overflow = len(logs) + len(kept) - logs.maxlen
+                    if overflow > 0:
+                        for evicted in islice(logs, overflow):
+                            self._storage_bytes -= _entry_size(evicted)
+                            self._unindex_record(level, evicted)
+                    logs.extend(kept)
+                    self._storage_bytes += sum(_entry_size(e) for e in kept)
+                    for record in kept:
+                        self._index_record(level, record)
             
-            self.metrics['logs_processed'] += len(self.log_buffer)
-            self.log_buffer.clear()
-            self.last_flush = datetime.utcnow()
+            # Records are already in memory storage, so a failed file write
+            # loses only the on-disk copy
+            if self.log_file_path:
+                try:
+                    await self._persist_batch(groups)
+                except Exception as e:
+                    self.metrics['log_ingest_errors'] += 1
+                    self.logger.error("Error writing logs to %s: %s", self.log_file_path, e, exc_info=True)
             
-            self.logger.debug(f"Flushed {len(self.log_buffer)} logs to storage")
+            self.metrics['logs_processed'] += flushed
+            self._last_flush_mono = time.monotonic()
+            
+            self.logger.debug("Flushed %d logs to storage", flushed)
+            return flushed
         except Exception as e:
             self.metrics['log_ingest_errors'] += 1
-            self.logger.error(f"Error flushing logs: {str(e)}", exc_info=True)
+            self.logger.error("Error flushing logs: %s", e, exc_info=True)
+            return 0
+    
+    def _index_record(self, level: str, record: LogRecord):
+        """Add a stored record to the source index"""
+        levels = self._by_source.get(record.source)
+        if levels is None:
+            levels = self._by_source[record.source] = {}
+            if not self._source_index_complete:
+                self._partial_sources.add(record.source)
+            if len(self._by_source) > MAX_INDEXED_SOURCES:
+                dropped, _ = self._by_source.popitem(last=False)
+                self._partial_sources.discard(dropped)
+                self._source_index_complete = False
+        else:
+            self._by_source.move_to_end(record.source)
+        records = levels.get(level)
+        if records is None:
+            records = levels[level] = deque(maxlen=MAX_PER_SOURCE)
+        records.append(record)
+    
+    def _unindex_record(self, level: str, record: LogRecord):
+        """Remove a record evicted from log_storage from the source index
+        
+        Each level evicts oldest first, so an indexed record is at the head of
+        its source's deque for that level.
+        """
+        levels = self._by_source.get(record.source)
+        records = levels.get(level) if levels is not None else None
+        if records and records[0] is record:
+            records.popleft()
+            if not records:
+                del levels[level]
+                if not levels:
+                    del self._by_source[record.source]
+                    self._partial_sources.discard(record.source)
+    
+    async def _persist_batch(self, groups: Dict[str, List[LogRecord]]):
+        """Append a flushed batch to the log file as a single NDJSON write"""
+        payload = b''.join(
+            orjson.dumps(record.to_dict(), default=str) + b'\n'
+            for group in groups.values()
+            for record in group
+        )
+        await asyncio.to_thread(self._append_to_log_file, payload)
+    
+    def _append_to_log_file(self, payload: bytes):
+        """Write a serialized batch to the log file (runs in a worker thread)"""
+        with open(self.log_file_path, 'ab') as f:
+            f.write(payload)
+    
+    def _retention_cutoffs(self) -> Dict[str, float]:
+        """Return the epoch-seconds retention cutoff for each level"""
+        now = datetime.utcnow()
+        return {
+            level: (now - self.retention_policies.get(level, timedelta(days=30))).timestamp()
+            for level in self.log_storage
+        }
     
     async def _cleanup_old_logs(self):
         """Remove logs older than retention period"""
-        now = datetime.utcnow()
+        cutoffs = self._retention_cutoffs()
         for level, logs in self.log_storage.items():
-            retention = self.retention_policies.get(level, timedelta(days=30))
-            cutoff = now - retention
+            cutoff_ts = cutoffs[level]
             
-            # Filter out old logs
-            original_count = len(logs)
-            self.log_storage[level] = [
-                log for log in logs 
-                if datetime.fromisoformat(log['timestamp']) > cutoff
-            ]
+            # Entries are appended in arrival order, so expired ones sit at the head
+            removed = 0
+            while logs and logs[0].ts <= cutoff_ts:
+                record = logs.popleft()
+                self._storage_bytes -= _entry_size(record)
+                self._unindex_record(level, record)
+                removed += 1
             
-            removed = original_count - len(self.log_storage[level])
-            if removed > 0:
-                self.logger.debug(f"Removed {removed} old {level} logs (retention: {retention.days} days)")
+            if removed > 0 and self.logger.isEnabledFor(logging.DEBUG):
+                retention = self.retention_policies.get(level, timedelta(days=30))
+                self.logger.debug("Removed %d old %s logs (retention: %d days)", removed, level, retention.days)
     
     async def _update_metrics(self):
         """Update metrics about logging activity"""
-        now = datetime.utcnow()
+        now = time.monotonic()
         
         # Calculate ingest rate (logs per second)
-        if self.metrics['last_ingest_time']:
-            time_diff = (now - self.metrics['last_ingest_time']).total_seconds()
+        if self._last_rate_mono is not None:
+            time_diff = now - self._last_rate_mono
             if time_diff > 0:
                 self.metrics['ingest_rate'] = len(self.log_buffer) / time_diff
         
-        self.metrics['last_ingest_time'] = now
+        self._last_rate_mono = now
+        self.metrics['last_ingest_time'] = datetime.utcnow()
         
         # Update agent metrics
-        self.definition.state.metrics.active_tasks = len(self.active_tasks)
-        self.definition.state.metrics.memory_usage_mb = len(str(self.log_storage)) / (1024 * 1024)  # Rough estimate
+        self.definition.state.metrics.active_tasks = self.active_task_count
+        self.definition.state.metrics.memory_usage_mb = self._storage_bytes / (1024 * 1024)  # Rough estimate
+        self._status_dirty = True
+    
+    def _iter_logs(self, level: Optional[str], source: Optional[str]) -> Iterator[LogRecord]:
+        """Lazily yield stored logs matching the filters, newest first"""
+        if source:
+            yield from self._iter_source(source, level)
+            return
+        
+        if level and level in self.log_storage:
+            records = reversed(self.log_storage[level])
+        else:
+            # Each level is already in arrival order, so a k-way merge avoids a full sort
+            records = heapq.merge(*(reversed(logs) for logs in self.log_storage.values()),
+                                  key=lambda r: r.timestamp, reverse=True)
+        
+        yield from records
+    
+    def _iter_source(self, source: str, level: Optional[str]) -> Iterator[LogRecord]:
+        """Yield stored logs for one source from the source index, newest first"""
+        levels = self._by_source.get(source)
+        if source in self._partial_sources or (levels is None and not self._source_index_complete):
+            # Sources dropped from the index are found by scanning storage
+            yield from (r for r in self._iter_logs(level, None) if r.source == source)
+            return
+        if levels is None:
+            return
+        
+        if level and level in self.log_storage:
+            yield from reversed(levels.get(level, ()))
+        else:
+            yield from heapq.merge(*(reversed(records) for records in levels.values()),
+                                   key=lambda r: r.timestamp, reverse=True)
+    
+    def _query_logs(self, level: Optional[str], source: Optional[str], limit: int) -> List[LogRecord]:
+        """Return up to ``limit`` stored logs, newest first"""
+        return list(islice(self._iter_logs(level, source), limit))
     
     # Message handlers
     async def _handle_log_message(self, message: Message):
         """Handle incoming log messages"""
         try:
-            log_entry = {
-                'timestamp': message.header.timestamp.isoformat(),
-                'level': message.payload.get('level', 'info'),
-                'message': message.payload.get('message', ''),
-                'source': message.payload.get('source', 'unknown'),
-                'agent_id': str(message.header.source_agent_id),
-                'context': message.payload.get('context', {})
-            }
+            header = message.header
+            get = message.payload.get
+            level = get('level', 'info')
             
-            # Add to buffer
-            self.log_buffer.append(log_entry)
+            # Drop logs below the configured level before doing any other work
+            if _LEVEL_INT.get(level.lower(), logging.CRITICAL) < self._min_level:
+                self.metrics['logs_processed'] += 1
+                if header.requires_ack:
+                    self._schedule_acknowledgment(message)
+                return
             
-            # Forward to appropriate log level handler
-            level = log_entry['level'].lower()
-            if level in ['debug', 'info', 'warning', 'error', 'critical']:
-                getattr(self.logger, level)(
-                    f"[{log_entry['source']}] {log_entry['message']}",
-                    extra={"context": log_entry['context']}
-                )
+            record = LogRecord(
+                ts=header.timestamp.timestamp(),
+                timestamp=header.timestamp.isoformat(),
+                level=level,
+                message=get('message', ''),
+                source=get('source', 'unknown'),
+                agent_id=str(header.source_agent_id),
+                context=get('context') or _EMPTY_CONTEXT
+            )
+            
+            # Buffering and forwarding to the agent logger happen in the ingest worker
+            self._enqueue_log(record)
             
             # Acknowledge receipt if requested
             if message.header.requires_ack:
-                await self._send_acknowledgment(message)
+                self._schedule_acknowledgment(message)
                 
         except Exception as e:
-            self.metrics['log_ingest_errors'] += 1
-            self.logger.error(f"Error processing log message: {str(e)}", exc_info=True)
+            self._log_ingest_error("Error processing log message: %s", e)
     
     async def _handle_error_message(self, message: Message):
         """Handle error messages"""
         try:
-            log_entry = {
-                'timestamp': message.header.timestamp.isoformat(),
-                'level': 'error',
-                'message': f"{message.payload.get('error_type', 'UnknownError')}: {message.payload.get('error_message', 'No message')}",
-                'source': message.payload.get('source', 'unknown'),
-                'agent_id': str(message.header.source_agent_id),
-                'context': {
-                    'error_type': message.payload.get('error_type'),
-                    'stack_trace': message.payload.get('stack_trace'),
-                    **message.payload.get('context', {})
+            header = message.header
+            get = message.payload.get
+            error_type = get('error_type')
+            record = LogRecord(
+                ts=header.timestamp.timestamp(),
+                timestamp=header.timestamp.isoformat(),
+                level='error',
+                message=f"{error_type or 'UnknownError'}: {get('error_message', 'No message')}",
+                source=get('source', 'unknown'),
+                agent_id=str(header.source_agent_id),
+                context={
+                    'error_type': error_type,
+                    'stack_trace': get('stack_trace'),
+                    **(get('context') or _EMPTY_CONTEXT)
                 }
-            }
-            
-            # Add to buffer
-            self.log_buffer.append(log_entry)
-            
-            # Log the error
-            self.logger.error(
-                log_entry['message'],
-                extra={"context": log_entry['context']}
             )
             
+            # Buffering and logging happen in the ingest worker
+            self._enqueue_log(record, is_error=True)
+            
             # Acknowledge receipt if requested
             if message.header.requires_ack:
-                await self._send_acknowledgment(message)
+                self._schedule_acknowledgment(message)
                 
         except Exception as e:
-            self.metrics['log_ingest_errors'] += 1
-            self.logger.error(f"Error processing error message: {str(e)}", exc_info=True)
+            self._log_ingest_error("Error processing error message: %s", e)
     
     async def _handle_command(self, message: Message):
         """Handle command messages"""
@@ -254,23 +551,7 @@ class LoggerAgent(BaseAgent):
                 source = params.get('source')
                 limit = min(int(params.get('limit', 100)), 1000)  # Max 1000 logs
                 
-                logs = []
-                if level and level in self.log_storage:
-                    logs = self.log_storage[level][-limit:]
-                else:
-                    # Get from all levels if no specific level provided
-                    for level_logs in self.log_storage.values():
-                        logs.extend(level_logs[-limit:])
-                
-                # Filter by source if specified
-                if source:
-                    logs = [log for log in logs if log.get('source') == source]
-                
-                # Sort by timestamp
-                logs.sort(key=lambda x: x.get('timestamp', ''), reverse=True)
-                
-                # Apply limit again after filtering
-                logs = logs[:limit]
+                logs = [record.to_dict() for record in self._query_logs(level, source, limit)]
                 
                 # Send response
                 response = ResponseMessage(
@@ -296,10 +577,10 @@ class LoggerAgent(BaseAgent):
                 
             elif command == 'flush_logs':
                 # Force flush logs
-                await self._flush_logs()
+                flushed = await self._flush_logs()
                 response = ResponseMessage(
                     status="success",
-                    data={"message": f"Flushed {len(self.log_buffer)} logs"},
+                    data={"message": f"Flushed {flushed} logs"},
                     context={"command": command}
                 )
                 await self.send_message(message.header.source_agent_id, response)
@@ -307,9 +588,10 @@ class LoggerAgent(BaseAgent):
             elif command == 'set_log_level':
                 # Change log level
                 level = params.get('level', '').upper()
-                if hasattr(logging, level):
+                if level in _VALID_LEVELS:
                     self.definition.config.log_level = level
-                    self.logger.setLevel(level)
+                    self.logger.setLevel(logging.getLevelName(level))
+                    self._min_level = self.logger.getEffectiveLevel()
                     response = ResponseMessage(
                         status="success",
                         data={"message": f"Log level set to {level}"},
@@ -354,7 +636,7 @@ class LoggerAgent(BaseAgent):
         """Handle alert messages"""
         # Log alerts at warning level or higher depending on severity
         severity = message.payload.get('severity', 'medium').lower()
-        log_method = getattr(self.logger, severity if hasattr(self.logger, severity) else 'warning')
+        log_method = self._log_by_level.get(severity, self.logger.warning)
         
         log_method(
             f"ALERT [{severity.upper()}] {message.payload.get('title', 'No title')}",
@@ -372,6 +654,12 @@ class LoggerAgent(BaseAgent):
                 extra=message.payload
             )
     
+    def _schedule_acknowledgment(self, original_message: Message):
+        """Send an acknowledgment in the background without blocking ingest"""
+        task = asyncio.create_task(self._send_acknowledgment(original_message))
+        self._ack_tasks.add(task)
+        task.add_done_callback(self._ack_tasks.discard)
+    
     async def _send_acknowledgment(self, original_message: Message):
         """Send acknowledgment for a received message"""
         ack = ResponseMessage(
@@ -392,18 +680,7 @@ class LoggerAgent(BaseAgent):
     # Public API methods
     async def get_logs(self, level: Optional[str] = None, source: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
         """Get logs with optional filtering"""
-        logs = []
-        if level and level in self.log_storage:
-            logs = self.log_storage[level][-limit:]
-        else:
-            for level_logs in self.log_storage.values():
-                logs.extend(level_logs[-limit:])
-        
-        if source:
-            logs = [log for log in logs if log.get('source') == source]
-        
-        logs.sort(key=lambda x: x.get('timestamp', ''), reverse=True)
-        return logs[:limit]
+        return [record.to_dict() for record in self._query_logs(level, source, limit)]
     
     async def get_metrics(self) -> Dict[str, Any]:
         """Get current metrics"""
@@ -416,8 +693,8 @@ class LoggerAgent(BaseAgent):
     
     async def flush_logs(self):
         """Force flush logs to storage"""
-        await self._flush_logs()
-        return {"status": "success", "message": f"Flushed {len(self.log_buffer)} logs"}
+        flushed = await self._flush_logs()
+        return {"status": "success", "message": f"Flushed {flushed} logs"}
     
     def __str__(self):
         """String representation of the logger agent"""
@@ -1,9 +1,19 @@
 import asyncio
+import base64
+import heapq
 import logging
 import psutil
 import platform
 import socket
+import struct
+import threading
+import time
+from array import array
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Dict, List, Optional, Any, Set, Tuple
 from uuid import UUID, uuid4
 
@@ -12,9 +22,397 @@ from ..schemas.messages import Message, MessageHeader, MessageType, MessagePrior
 from ..schemas.crews import CrewDefinition, CrewMember, CrewRole
 from ..base_agent import BaseAgent
 
+# Numeric fields of a CPU sample, stored column-wise
+CPU_FIELDS = ('cpu_percent', 'user', 'system', 'idle', 'iowait', 'irq',
+              'softirq', 'steal', 'guest', 'guest_nice')
+
+# Summary of the fast CPU samples taken during one aggregation interval
+CPU_SUMMARY_FIELDS = ('cpu_ewma', 'cpu_min', 'cpu_max', 'cpu_p95')
+
+class MetricColumns:
+    """Fixed-capacity ring buffer that stores numeric samples as float64 columns
+    
+    Samples are appended and read back as dicts, but held as one ``array('d')``
+    per field instead of one dict per sample.
+    """
+    
+    def __init__(self, fields: Tuple[str, ...], maxlen: int):
+        self.fields = fields
+        self.maxlen = maxlen
+        self._columns = {field: array('d', bytes(8 * maxlen)) for field in fields}
+        self._timestamps: List[Optional[datetime]] = [None] * maxlen
+        self._head = 0  # Total number of samples ever written
+    
+    def __len__(self) -> int:
+        return min(self._head, self.maxlen)
+    
+    def _slot(self, index: int) -> int:
+        """Map a logical index (oldest first) to a ring slot"""
+        size = len(self)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("MetricColumns index out of range")
+        return (self._head - size + index) % self.maxlen
+    
+    def _sample(self, slot: int) -> Dict[str, Any]:
+        sample = {'timestamp': self._timestamps[slot]}
+        for field, column in self._columns.items():
+            sample[field] = column[slot]
+        return sample
+    
+    def __getitem__(self, index: int) -> Dict[str, Any]:
+        return self._sample(self._slot(index))
+    
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+    
+    def append(self, sample: Dict[str, Any]):
+        """Write a sample into the next slot, overwriting the oldest when full"""
+        slot = self._head % self.maxlen
+        self._timestamps[slot] = sample.get('timestamp')
+        for field, column in self._columns.items():
+            column[slot] = sample.get(field) or 0.0
+        self._head += 1
+    
+    def latest(self, field: str) -> Optional[float]:
+        """Return the most recent value of a field"""
+        if not self._head:
+            return None
+        return self._columns[field][(self._head - 1) % self.maxlen]
+    
+    def tail(self, limit: int) -> List[Dict[str, Any]]:
+        """Materialize the last ``limit`` samples as dicts, oldest first"""
+        size = len(self)
+        return [self[index] for index in range(max(0, size - limit), size)]
+
+class ProcfsReader:
+    """Reads CPU, memory and network counters straight from Linux /proc files
+    
+    The pseudo-files are opened once and re-read with ``seek(0)`` each cycle,
+    parsing only the fields the monitoring agent reports.
+    """
+    
+    _MEMINFO_KEYS = {
+        b'MemTotal:': 'total', b'MemFree:': 'free', b'MemAvailable:': 'available',
+        b'Buffers:': 'buffers', b'Cached:': 'cached', b'SReclaimable:': 'sreclaimable',
+        b'Shmem:': 'shared', b'Active:': 'active', b'Inactive:': 'inactive',
+        b'SwapTotal:': 'swap_total', b'SwapFree:': 'swap_free'
+    }
+    
+    def __init__(self):
+        self._stat = open('/proc/stat', 'rb', buffering=0)
+        self._meminfo = open('/proc/meminfo', 'rb', buffering=0)
+        self._netdev = open('/proc/net/dev', 'rb', buffering=0)
+        # Separate baselines so the fast sampler does not reset the report's interval
+        self._last_cpu = dict.fromkeys(('report', 'sample'), self._read_cpu_counters())
+    
+    @staticmethod
+    def _read(f) -> bytes:
+        f.seek(0)
+        return f.read()
+    
+    def _read_cpu_counters(self) -> List[int]:
+        """Return the aggregate ``cpu`` line of /proc/stat as ten integers"""
+        line = self._read(self._stat).split(b'\n', 1)[0]
+        values = [int(v) for v in line.split()[1:11]]
+        values += [0] * (10 - len(values))
+        # The kernel includes guest time in user/nice; report them separately like psutil
+        values[0] -= values[8]
+        values[1] -= values[9]
+        return values
+    
+    def read_cpu(self, baseline: str = 'report') -> Tuple[float, Dict[str, float]]:
+        """Return overall CPU percent and per-state percentages since the last call
+        made with the same ``baseline``"""
+        current = self._read_cpu_counters()
+        deltas = [max(0, c - p) for c, p in zip(current, self._last_cpu[baseline])]
+        self._last_cpu[baseline] = current
+        total = sum(deltas)
+        if not total:
+            return 0.0, {field: 0.0 for field in CPU_FIELDS[1:]}
+        user, nice, system, idle, iowait, irq, softirq, steal, guest, guest_nice = (
+            round(100.0 * d / total, 1) for d in deltas
+        )
+        cpu_percent = round(100.0 * (total - deltas[3] - deltas[4]) / total, 1)
+        return cpu_percent, {
+            'user': user, 'system': system, 'idle': idle, 'iowait': iowait,
+            'irq': irq, 'softirq': softirq, 'steal': steal,
+            'guest': guest, 'guest_nice': guest_nice
+        }
+    
+    def read_memory(self) -> Dict[str, Any]:
+        """Return memory and swap figures in bytes, derived as psutil does on Linux"""
+        raw: Dict[str, int] = {}
+        for line in self._read(self._meminfo).splitlines():
+            key, _, rest = line.partition(b' ')
+            name = self._MEMINFO_KEYS.get(key)
+            if name is not None:
+                raw[name] = int(rest.split()[0]) * 1024
+                if len(raw) == len(self._MEMINFO_KEYS):
+                    break
+        
+        total = raw.get('total', 0)
+        free = raw.get('free', 0)
+        available = raw.get('available', free)
+        buffers = raw.get('buffers', 0)
+        cached = raw.get('cached', 0) + raw.get('sreclaimable', 0)
+        used = total - free - buffers - cached
+        if used < 0:
+            used = total - free
+        swap_total = raw.get('swap_total', 0)
+        swap_free = raw.get('swap_free', 0)
+        swap_used = swap_total - swap_free
+        return {
+            'total': total,
+            'available': available,
+            'percent': round(100.0 * (total - available) / total, 1) if total else 0.0,
+            'used': used,
+            'free': free,
+            'active': raw.get('active', 0),
+            'inactive': raw.get('inactive', 0),
+            'buffers': buffers,
+            'cached': cached,
+            'shared': raw.get('shared', 0),
+            'swap_total': swap_total,
+            'swap_used': swap_used,
+            'swap_free': swap_free,
+            'swap_percent': round(100.0 * swap_used / swap_total, 1) if swap_total else 0.0
+        }
+    
+    def read_network(self) -> Dict[str, int]:
+        """Return interface counters summed across all interfaces"""
+        totals = [0] * 8
+        for line in self._read(self._netdev).splitlines()[2:]:
+            _, _, data = line.partition(b':')
+            fields = data.split()
+            if len(fields) < 12:
+                continue
+            # rx: bytes packets errs drop ... | tx: bytes packets errs drop
+            for i, column in enumerate((0, 1, 2, 3, 8, 9, 10, 11)):
+                totals[i] += int(fields[column])
+        bytes_recv, packets_recv, errin, dropin, bytes_sent, packets_sent, errout, dropout = totals
+        return {
+            'bytes_sent': bytes_sent,
+            'bytes_recv': bytes_recv,
+            'packets_sent': packets_sent,
+            'packets_recv': packets_recv,
+            'errin': errin,
+            'errout': errout,
+            'dropin': dropin,
+            'dropout': dropout
+        }
+    
+    def close(self):
+        for f in (self._stat, self._meminfo, self._netdev):
+            f.close()
+
+@lru_cache(maxsize=256)
+def _alert_title(alert_type: str) -> str:
+    """Turn an alert type such as ``high_queue_depth`` into a display title"""
+    return alert_type.replace('_', ' ').title()
+
+def _tail(values, limit: int) -> List[Dict]:
+    """Return the last ``limit`` items of a history without slicing a full copy"""
+    if isinstance(values, MetricColumns):
+        return values.tail(limit)
+    return list(islice(values, max(0, len(values) - limit), None))
+
+class MetricRollup:
+    """Downsamples one numeric series into fixed time windows of count/avg/min/max
+    
+    Closed windows are kept in a bounded deque, so a tier covers ``window * maxlen``
+    seconds regardless of how often raw samples arrive.
+    """
+    
+    def __init__(self, window: int, maxlen: int):
+        self.window = window
+        self.buckets: deque = deque(maxlen=maxlen)
+        self._start: Optional[int] = None
+        self._count = 0
+        self._sum = 0.0
+        self._min = 0.0
+        self._max = 0.0
+    
+    def add(self, epoch_seconds: float, value: float):
+        """Fold a sample into the current window, closing it if the window has passed"""
+        start = int(epoch_seconds) - int(epoch_seconds) % self.window
+        if start != self._start:
+            self._close()
+            self._start, self._count, self._sum = start, 0, 0.0
+            self._min = self._max = value
+        self._count += 1
+        self._sum += value
+        if value < self._min:
+            self._min = value
+        elif value > self._max:
+            self._max = value
+    
+    def _close(self):
+        if self._count:
+            self.buckets.append(self._bucket())
+    
+    def _bucket(self) -> Dict[str, Any]:
+        return {
+            'timestamp': datetime.utcfromtimestamp(self._start),
+            'count': self._count,
+            'avg': self._sum / self._count,
+            'min': self._min,
+            'max': self._max
+        }
+    
+    def tail(self, limit: int) -> List[Dict[str, Any]]:
+        """Return the last ``limit`` windows, including the still-open one"""
+        if not self._count or limit <= 0:
+            return _tail(self.buckets, limit)
+        return _tail(self.buckets, limit - 1) + [self._bucket()]
+
+class _BitWriter:
+    """Appends bit fields to an arbitrary-precision integer"""
+    
+    __slots__ = ('value', 'nbits')
+    
+    def __init__(self):
+        self.value = 0
+        self.nbits = 0
+    
+    def write(self, bits: int, width: int):
+        self.value = (self.value << width) | bits
+        self.nbits += width
+    
+    def to_bytes(self) -> bytes:
+        pad = -self.nbits % 8
+        return (self.value << pad).to_bytes((self.nbits + pad) // 8, 'big')
+
+class _BitReader:
+    """Reads bit fields written by :class:`_BitWriter`"""
+    
+    __slots__ = ('value', 'nbits', 'pos')
+    
+    def __init__(self, data: bytes):
+        self.value = int.from_bytes(data, 'big')
+        self.nbits = len(data) * 8
+        self.pos = 0
+    
+    def read(self, width: int) -> int:
+        self.pos += width
+        return (self.value >> (self.nbits - self.pos)) & ((1 << width) - 1)
+
+def gorilla_encode(values: List[float]) -> bytes:
+    """XOR-compress a float64 series as described in Facebook's Gorilla paper
+    
+    The first value is stored raw. Each following value is XORed with its
+    predecessor: an identical value costs one bit, otherwise only the
+    meaningful bits between the leading and trailing zeros are written,
+    reusing the previous bit window when it still fits.
+    """
+    if not values:
+        return b''
+    words = struct.unpack(f'>{len(values)}Q', struct.pack(f'>{len(values)}d', *values))
+    out = _BitWriter()
+    out.write(words[0], 64)
+    prev = words[0]
+    prev_leading, prev_trailing = -1, 0
+    for word in words[1:]:
+        xor = word ^ prev
+        prev = word
+        if not xor:
+            out.write(0, 1)
+            continue
+        leading = min(64 - xor.bit_length(), 31)
+        trailing = (xor & -xor).bit_length() - 1
+        if prev_leading >= 0 and leading >= prev_leading and trailing >= prev_trailing:
+            out.write(0b10, 2)
+            out.write(xor >> prev_trailing, 64 - prev_leading - prev_trailing)
+        else:
+            length = 64 - leading - trailing
+            out.write(0b11, 2)
+            out.write(leading, 5)
+            out.write(length - 1, 6)
+            out.write(xor >> trailing, length)
+            prev_leading, prev_trailing = leading, trailing
+    return out.to_bytes()
+
+def gorilla_decode(data: bytes, count: int) -> List[float]:
+    """Decode ``count`` values produced by :func:`gorilla_encode`"""
+    if not count:
+        return []
+    bits = _BitReader(data)
+    word = bits.read(64)
+    words = [word]
+    leading = trailing = 0
+    for _ in range(count - 1):
+        if bits.read(1):
+            if bits.read(1):
+                leading = bits.read(5)
+                trailing = 64 - leading - (bits.read(6) + 1)
+            word ^= bits.read(64 - leading - trailing) << trailing
+        words.append(word)
+    return list(struct.unpack(f'>{count}d', struct.pack(f'>{count}Q', *words)))
+
+_EPOCH = datetime(1970, 1, 1)
+
+def _epoch_seconds(timestamp: Any) -> int:
+    """Convert a naive UTC datetime (or its ISO string) to whole epoch seconds"""
+    if isinstance(timestamp, str):
+        timestamp = datetime.fromisoformat(timestamp)
+    return int((timestamp - _EPOCH).total_seconds())
+
+def compress_samples(samples: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Encode a list of samples column-wise for transport
+    
+    Timestamps become delta-of-delta integers (mostly zero for a fixed interval)
+    and every numeric field becomes a base64 Gorilla-encoded float64 column.
+    """
+    result: Dict[str, Any] = {'encoding': 'gorilla', 'count': len(samples), 'timestamps': [], 'columns': {}}
+    if not samples:
+        return result
+    
+    epochs = [_epoch_seconds(sample['timestamp']) for sample in samples]
+    timestamps = [epochs[0]]
+    prev_delta = 0
+    for prev, current in zip(epochs, epochs[1:]):
+        delta = current - prev
+        timestamps.append(delta - prev_delta)
+        prev_delta = delta
+    result['timestamps'] = timestamps
+    
+    for field, value in samples[0].items():
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            column = [float(sample.get(field) or 0.0) for sample in samples]
+            result['columns'][field] = base64.b64encode(gorilla_encode(column)).decode('ascii')
+    return result
+
 class MonitoringAgent(BaseAgent):
     """Specialized agent for system and application monitoring"""
     
+    _EXTRA_HANDLERS = {
+        MessageType.COMMAND: '_handle_command',
+        MessageType.STATUS_UPDATE: '_handle_status_update',
+        MessageType.METRIC: '_handle_metric_message'
+    }
+    
+    _ALERT_TITLES = {
+        'high_cpu_usage': 'High CPU Usage',
+        'high_memory_usage': 'High Memory Usage',
+        'high_disk_usage': 'High Disk Usage',
+        'high_network_errors': 'High Network Errors'
+    }
+    
+    # Default get_metrics limit, whose responses are memoized between samples
+    _METRICS_VIEW_LIMIT = 100
+    
+    # Resolutions accepted by get_metrics: raw samples or the rollup tiers
+    _METRICS_RESOLUTIONS = ('raw', '5m', '1h')
+    
+    # Field downsampled into the retention tiers for each metric type; other
+    # metric types are rolled up when their samples carry a numeric 'value'
+    _ROLLUP_FIELDS = {
+        'cpu': 'cpu_percent',
+        'memory': 'percent'
+    }
+    
     def __init__(self, agent_definition: Optional[AgentDefinition] = None):
         """Initialize the monitoring agent"""
         if agent_definition is None:
@@ -23,15 +421,38 @@ class MonitoringAgent(BaseAgent):
         super().__init__(agent_definition)
         
         # Monitoring state
-        self.metrics_history: Dict[str, List[Dict]] = {
-            'cpu': [],
-            'memory': [],
-            'disk': [],
-            'network': []
-        }
         self.max_metrics_history = 1000
-        self.last_metrics_update = datetime.utcnow()
-        self.metrics_interval = 60  # seconds
+        self.metrics_history: Dict[str, Any] = {
+            metric_type: deque(maxlen=self.max_metrics_history)
+            for metric_type in ('memory', 'network')
+        }
+        # CPU samples are all floats, so they are stored column-wise
+        self.metrics_history['cpu'] = MetricColumns(CPU_FIELDS + CPU_SUMMARY_FIELDS,
+                                                   self.max_metrics_history)
+        # Disk samples are kept per mountpoint rather than interleaved in one stream
+        self._disk_history: Dict[str, deque] = {}
+        # Older data survives in downsampled tiers: 5-minute windows for ~24h and
+        # hourly windows for 30 days, beside the raw samples above
+        self._agg_5m: Dict[str, MetricRollup] = {}
+        self._agg_1h: Dict[str, MetricRollup] = {}
+        # Bumped on every stored sample; memoized get_metrics views are tagged with it
+        self._metrics_version = 0
+        self._metrics_view_cache: Dict[Tuple, Tuple[int, Any]] = {}
+        self.last_metrics_update_ns = time.time_ns()
+        self.metrics_interval = 60  # seconds between stored/reported samples
+        
+        # CPU and memory are observed cheaply every sample_interval and summarized
+        # into the stored sample, so spikes alert without waiting for the next report
+        self.sample_interval = 5  # seconds
+        self._sample_alpha = 0.3  # EWMA smoothing factor
+        self._ewma_cpu: Optional[float] = None
+        self._cpu_window: List[float] = []
+        self._max_memory = 0.0
+        self._disk_usage_timeout = 5.0  # seconds per mountpoint
+        # statvfs on a stale mount can block its thread indefinitely, so probes run
+        # on their own small pool and a mount is not re-probed while one is pending
+        self._disk_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='disk-probe')
+        self._disk_probes: Dict[str, asyncio.Future] = {}
         
         # Thresholds for alerts
         self.thresholds = {
@@ -41,12 +462,62 @@ class MonitoringAgent(BaseAgent):
             'network_errors': 10  # per minute
         }
         
-        # Track network errors
-        self.network_error_counts: Dict[str, int] = {}
-        self.last_network_check = datetime.utcnow()
+        # Alert debouncing: an active alert re-fires at most once per cooldown, and is
+        # re-armed once its value drops below threshold minus the hysteresis band
+        self._alert_cooldown = 300.0  # seconds
+        self._alert_hysteresis = 5.0  # percentage points
+        self._alert_last_fired: Dict[str, float] = {}
+        self._alert_active: Set[str] = set()
+        
+        # Tracebacks are logged at most once per error key per interval; the rest
+        # are logged as one line and counted
+        self._err_traceback_interval = 3600.0  # seconds
+        self._err_last_logged: Dict[str, float] = {}
+        self._err_counts: Dict[str, int] = {}
+        
+        # Error counters from the previous collection, for the per-minute error rate
+        self.last_net_io: Optional[Dict[str, int]] = None
+        
+        # Command name -> handler, looked up once per command message
+        self._command_table = {
+            'get_metrics': self._cmd_get_metrics,
+            'get_system_info': self._cmd_get_system_info,
+            'refresh_system_info': self._cmd_refresh_system_info,
+            'get_processes': self._cmd_get_processes,
+            'set_threshold': self._cmd_set_threshold
+        }
+        
+        # psutil.Process objects reused across get_processes requests, keyed by pid;
+        # the lock serialises collections, which run in worker threads
+        self._proc_cache: Dict[int, psutil.Process] = {}
+        self._proc_cache_lock = threading.Lock()
+        
+        # Host facts are constant for the agent's lifetime, so gather them once
+        self._system_info = self._build_system_info()
+        
+        # On Linux read /proc directly; psutil remains the portable fallback
+        self._procfs: Optional[ProcfsReader] = None
+        if platform.system() == 'Linux':
+            try:
+                self._procfs = ProcfsReader()
+            except (OSError, ValueError) as e:
+                self.logger.warning(f"Falling back to psutil, cannot read /proc: {str(e)}")
+        
+        # Prime psutil's CPU counters so non-blocking samples measure since this point
+        psutil.cpu_percent(interval=None)
+        psutil.cpu_times_percent(interval=None)
+        self._sample_cpu_times = psutil.cpu_times()
+        
+        # Alerts are queued by the metrics loop and broadcast in batches by a consumer task
+        self._alert_queue: asyncio.Queue = asyncio.Queue(maxsize=256)
+        self._alert_batch_size = 16
+        # Batch taken off the queue by the consumer but not yet broadcast
+        self._alerts_in_hand: List[Dict] = []
         
-        # Start metrics collection
+        # Start metrics collection and alert delivery
         self.metrics_task = asyncio.create_task(self._collect_metrics_loop())
+        self._sample_task = asyncio.create_task(self._sample_loop())
+        self._alert_flush_task = asyncio.create_task(self._alert_flush_loop())
     
     @classmethod
     def _create_default_definition(cls) -> AgentDefinition:
@@ -98,133 +569,170 @@ class MonitoringAgent(BaseAgent):
             state=state
         )
     
-    def _register_message_handlers(self) -> Dict[str, Any]:
-        """Register message handlers specific to the monitoring agent"""
-        return {
-            MessageType.COMMAND: self._handle_command,
-            MessageType.STATUS_UPDATE: self._handle_status_update,
-            MessageType.METRIC: self._handle_metric_message
-        }
-    
     async def _collect_metrics_loop(self):
-        """Main loop for collecting system metrics"""
+        """Main loop for collecting system metrics on a fixed, drift-free cadence"""
+        loop = asyncio.get_running_loop()
+        next_fire = loop.time()
         while self.running:
             try:
                 await self._collect_system_metrics()
-                await asyncio.sleep(self.metrics_interval)
+                # Anchor to absolute deadlines so collection time does not accumulate as drift;
+                # skip ticks that were missed entirely instead of bursting to catch up
+                next_fire += self.metrics_interval
+                now = loop.time()
+                if next_fire < now:
+                    next_fire = now
+                await asyncio.sleep(next_fire - now)
             except asyncio.CancelledError:
                 break
             except Exception as e:
-                self.logger.error(f"Error in metrics collection loop: {str(e)}", exc_info=True)
+                self._log_err('metrics_loop', f"Error in metrics collection loop: {str(e)}")
                 await asyncio.sleep(5)  # Prevent tight loop on errors
+                next_fire = loop.time()
+    
+    def _log_err(self, key: str, msg: str, exc: Optional[BaseException] = None):
+        """Log an error, attaching the traceback only once per key per interval
+        
+        Must be called from an ``except`` block unless ``exc`` is given.
+        """
+        self._err_counts[key] = self._err_counts.get(key, 0) + 1
+        now = time.monotonic()
+        last = self._err_last_logged.get(key)
+        if last is None or now - last > self._err_traceback_interval:
+            self._err_last_logged[key] = now
+            self.logger.error(msg, exc_info=exc or True)
+        else:
+            self.logger.error(msg)
+    
+    async def _sample_loop(self):
+        """Take lightweight CPU/memory samples between reports and alert on spikes"""
+        loop = asyncio.get_running_loop()
+        next_fire = loop.time()
+        while self.running:
+            try:
+                next_fire += self.sample_interval
+                now = loop.time()
+                if next_fire < now:
+                    next_fire = now
+                await asyncio.sleep(next_fire - now)
+                
+                cpu_percent = self._read_sample_cpu()
+                mem_percent = (await self._read_memory())['percent']
+                self._record_sample(cpu_percent, mem_percent)
+                await self._check_thresholds({
+                    'cpu': {'cpu_percent': cpu_percent},
+                    'memory': {'percent': mem_percent}
+                })
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                self._log_err('metrics_sample', f"Error sampling metrics: {str(e)}")
+                next_fire = loop.time()
+    
+    def _record_sample(self, cpu_percent: float, mem_percent: float):
+        """Fold one fast sample into the running statistics for this interval"""
+        if self._ewma_cpu is None:
+            self._ewma_cpu = cpu_percent
+        else:
+            self._ewma_cpu += self._sample_alpha * (cpu_percent - self._ewma_cpu)
+        self._cpu_window.append(cpu_percent)
+        if mem_percent > self._max_memory:
+            self._max_memory = mem_percent
+    
+    def _summarize_samples(self) -> Dict[str, float]:
+        """Summarize and reset the CPU samples taken since the previous report"""
+        window = sorted(self._cpu_window)
+        self._cpu_window.clear()
+        return {
+            'cpu_ewma': self._ewma_cpu,
+            'cpu_min': window[0],
+            'cpu_max': window[-1],
+            'cpu_p95': window[min(len(window) - 1, int(0.95 * len(window)))]
+        }
     
     async def _collect_system_metrics(self):
         """Collect system metrics"""
         try:
-            timestamp = datetime.utcnow()
+            # One clock read per sample, shared by every stream. Timestamps stay
+            # datetime objects; the message serializer encodes them natively.
+            now_ns = time.time_ns()
+            ts = datetime.utcfromtimestamp(now_ns / 1e9)
             
-            # CPU metrics
-            cpu_percent = psutil.cpu_percent(interval=1)
-            cpu_times = psutil.cpu_times_percent(interval=1)
-            
-            cpu_metrics = {
-                'timestamp': timestamp.isoformat(),
-                'cpu_percent': cpu_percent,
-                'user': cpu_times.user,
-                'system': cpu_times.system,
-                'idle': cpu_times.idle,
-                'iowait': getattr(cpu_times, 'iowait', 0),
-                'irq': getattr(cpu_times, 'irq', 0),
-                'softirq': getattr(cpu_times, 'softirq', 0),
-                'steal': getattr(cpu_times, 'steal', 0),
-                'guest': getattr(cpu_times, 'guest', 0),
-                'guest_nice': getattr(cpu_times, 'guest_nice', 0)
-            }
+            # CPU metrics (non-blocking, measured since the previous sample)
+            cpu_percent, cpu_times = self._read_cpu()
+            cpu_metrics = {'timestamp': ts, 'cpu_percent': cpu_percent, **cpu_times}
             
             # Memory metrics
-            memory = psutil.virtual_memory()
-            swap = psutil.swap_memory()
+            memory_metrics = {'timestamp': ts, **await self._read_memory()}
             
-            memory_metrics = {
-                'timestamp': timestamp.isoformat(),
-                'total': memory.total,
-                'available': memory.available,
-                'percent': memory.percent,
-                'used': memory.used,
-                'free': memory.free,
-                'active': getattr(memory, 'active', 0),
-                'inactive': getattr(memory, 'inactive', 0),
-                'buffers': getattr(memory, 'buffers', 0),
-                'cached': getattr(memory, 'cached', 0),
-                'shared': getattr(memory, 'shared', 0),
-                'swap_total': swap.total,
-                'swap_used': swap.used,
-                'swap_free': swap.free,
-                'swap_percent': swap.percent
-            }
+            # Fold in the fast samples taken since the previous report
+            self._record_sample(cpu_percent, memory_metrics['percent'])
+            cpu_metrics.update(self._summarize_samples())
+            memory_metrics['percent_max'] = self._max_memory
+            self._max_memory = 0.0
             
-            # Disk metrics
+            # Disk metrics: statvfs can hang on stale network mounts, so query all
+            # mountpoints concurrently, each bounded by a timeout
+            partitions = await asyncio.to_thread(psutil.disk_partitions, all=False)
+            usages = await asyncio.gather(
+                *(self._probe_disk_usage(partition.mountpoint) for partition in partitions),
+                return_exceptions=True
+            )
             disk_metrics = []
-            for partition in psutil.disk_partitions(all=False):
-                try:
-                    usage = psutil.disk_usage(partition.mountpoint)
-                    disk_metrics.append({
-                        'device': partition.device,
-                        'mountpoint': partition.mountpoint,
-                        'fstype': partition.fstype,
-                        'opts': partition.opts,
-                        'total': usage.total,
-                        'used': usage.used,
-                        'free': usage.free,
-                        'percent': usage.percent
-                    })
-                except Exception as e:
-                    self.logger.error(f"Error getting disk usage for {partition.mountpoint}: {str(e)}")
+            for partition, usage in zip(partitions, usages):
+                if isinstance(usage, BaseException):
+                    self._log_err(f"disk_usage:{partition.mountpoint}",
+                                  f"Error getting disk usage for {partition.mountpoint}: {usage!r}", usage)
+                    continue
+                disk_metrics.append({
+                    'timestamp': ts,
+                    'device': partition.device,
+                    'mountpoint': partition.mountpoint,
+                    'fstype': partition.fstype,
+                    'opts': partition.opts,
+                    'total': usage.total,
+                    'used': usage.used,
+                    'free': usage.free,
+                    'percent': usage.percent
+                })
             
             # Network metrics
-            net_io = psutil.net_io_counters()
-            net_metrics = {
-                'timestamp': timestamp.isoformat(),
-                'bytes_sent': net_io.bytes_sent,
-                'bytes_recv': net_io.bytes_recv,
-                'packets_sent': net_io.packets_sent,
-                'packets_recv': net_io.packets_recv,
-                'errin': net_io.errin,
-                'errout': net_io.errout,
-                'dropin': net_io.dropin,
-                'dropout': net_io.dropout
-            }
+            net_metrics = {'timestamp': ts, **await self._read_network()}
+            errin, errout = net_metrics['errin'], net_metrics['errout']
             
             # Check for network errors
-            if hasattr(self, 'last_net_io'):
-                time_diff = (timestamp - self.last_net_io['timestamp']).total_seconds()
+            if self.last_net_io is not None:
+                time_diff = (now_ns - self.last_net_io['timestamp_ns']) / 1e9
                 if time_diff > 0:
-                    err_rate = (net_io.errin + net_io.errout - 
+                    err_rate = (errin + errout -
                               (self.last_net_io['errin'] + self.last_net_io['errout'])) / time_diff * 60
                     
-                    if err_rate > self.thresholds['network_errors']:
-                        await self._trigger_alert(
+                    if err_rate <= self.thresholds['network_errors']:
+                        self._clear_alert("high_network_errors")
+                    else:
+                        self._trigger_alert(
                             "high_network_errors",
                             f"High network error rate detected: {err_rate:.2f} errors/minute",
                             {
                                 'error_rate': err_rate,
                                 'threshold': self.thresholds['network_errors'],
-                                'errors_in': net_io.errin - self.last_net_io['errin'],
-                                'errors_out': net_io.errout - self.last_net_io['errout']
+                                'errors_in': errin - self.last_net_io['errin'],
+                                'errors_out': errout - self.last_net_io['errout']
                             }
                         )
             
             # Save current values for next comparison
             self.last_net_io = {
-                'timestamp': timestamp,
-                'errin': net_io.errin,
-                'errout': net_io.errout
+                'timestamp_ns': now_ns,
+                'errin': errin,
+                'errout': errout
             }
             
             # Check thresholds and trigger alerts
             await self._check_thresholds({
                 'cpu': cpu_metrics,
                 'memory': memory_metrics,
+                'disk': disk_metrics,
                 'network': net_metrics
             })
             
@@ -235,36 +743,150 @@ class MonitoringAgent(BaseAgent):
             
             # Store disk metrics for each partition
             for disk in disk_metrics:
-                self._store_metrics('disk', disk)
+                history = self._disk_history.get(disk['mountpoint'])
+                if history is None:
+                    history = self._disk_history[disk['mountpoint']] = deque(maxlen=self.max_metrics_history)
+                history.append(disk)
+            # Container mounts come and go; forget the ones that are no longer mounted
+            for mountpoint in self._disk_history.keys() - {p.mountpoint for p in partitions}:
+                del self._disk_history[mountpoint]
+            self._metrics_version += 1
             
             # Update last metrics time
-            self.last_metrics_update = timestamp
+            self.last_metrics_update_ns = now_ns
             
             # Update agent metrics
-            self.definition.state.metrics.memory_usage_mb = memory.used / (1024 * 1024)
+            self.definition.state.metrics.memory_usage_mb = memory_metrics['used'] / (1024 * 1024)
             self.definition.state.metrics.cpu_usage = cpu_percent
+            self._status_dirty = True
             
         except Exception as e:
-            self.logger.error(f"Error collecting system metrics: {str(e)}", exc_info=True)
+            self._log_err('metrics_collect', f"Error collecting system metrics: {str(e)}")
     
-    def _store_metrics(self, metric_type: str, metrics: Dict):
-        """Store metrics in history"""
-        if metric_type not in self.metrics_history:
-            self.metrics_history[metric_type] = []
+    async def _probe_disk_usage(self, mountpoint: str):
+        """Return psutil.disk_usage for a mountpoint, skipping mounts whose last probe hangs
+        
+        The timeout only abandons the wait: the probe keeps its thread until
+        statvfs returns, and until then the mount is reported as unavailable
+        instead of tying up another thread.
+        """
+        probe = self._disk_probes.get(mountpoint)
+        if probe is not None:
+            raise TimeoutError(f"previous disk usage probe still pending for {mountpoint}")
+        
+        probe = asyncio.get_running_loop().run_in_executor(
+            self._disk_executor, psutil.disk_usage, mountpoint
+        )
+        self._disk_probes[mountpoint] = probe
+        
+        def _probe_done(future: asyncio.Future):
+            self._disk_probes.pop(mountpoint, None)
+            if not future.cancelled():
+                future.exception()  # retrieved here in case nobody awaits it any more
+        
+        probe.add_done_callback(_probe_done)
+        return await asyncio.wait_for(asyncio.shield(probe), timeout=self._disk_usage_timeout)
+    
+    def _read_cpu(self) -> Tuple[float, Dict[str, float]]:
+        """Return CPU percent and per-state percentages since the previous sample"""
+        if self._procfs is not None:
+            return self._procfs.read_cpu()
+        cpu_percent = psutil.cpu_percent(interval=None)
+        cpu_times = psutil.cpu_times_percent(interval=None)
+        return cpu_percent, {field: getattr(cpu_times, field, 0) for field in CPU_FIELDS[1:]}
+    
+    def _read_sample_cpu(self) -> float:
+        """Return CPU percent since the previous fast sample
+        
+        Uses its own baseline so sampling does not shorten the interval that
+        the next report's ``_read_cpu`` measures over.
+        """
+        if self._procfs is not None:
+            return self._procfs.read_cpu('sample')[0]
+        current = psutil.cpu_times()
+        last, self._sample_cpu_times = self._sample_cpu_times, current
+        # Guest time is already counted in user/nice, as psutil itself accounts it
+        total = sum(current) - sum(last) - sum(
+            getattr(current, f, 0) - getattr(last, f, 0) for f in ('guest', 'guest_nice')
+        )
+        idle = sum(getattr(current, f, 0) - getattr(last, f, 0) for f in ('idle', 'iowait'))
+        if total <= 0:
+            return 0.0
+        return round(max(0.0, min(100.0, 100.0 * (total - idle) / total)), 1)
+    
+    async def _read_memory(self) -> Dict[str, Any]:
+        """Return memory and swap usage"""
+        if self._procfs is not None:
+            return self._procfs.read_memory()
         
-        self.metrics_history[metric_type].append(metrics)
+        # psutil calls run off the event loop
+        memory = await asyncio.to_thread(psutil.virtual_memory)
+        swap = await asyncio.to_thread(psutil.swap_memory)
+        return {
+            'total': memory.total,
+            'available': memory.available,
+            'percent': memory.percent,
+            'used': memory.used,
+            'free': memory.free,
+            'active': getattr(memory, 'active', 0),
+            'inactive': getattr(memory, 'inactive', 0),
+            'buffers': getattr(memory, 'buffers', 0),
+            'cached': getattr(memory, 'cached', 0),
+            'shared': getattr(memory, 'shared', 0),
+            'swap_total': swap.total,
+            'swap_used': swap.used,
+            'swap_free': swap.free,
+            'swap_percent': swap.percent
+        }
+    
+    async def _read_network(self) -> Dict[str, int]:
+        """Return network I/O counters summed across interfaces"""
+        if self._procfs is not None:
+            return self._procfs.read_network()
+        
+        net_io = await asyncio.to_thread(psutil.net_io_counters)
+        return {
+            'bytes_sent': net_io.bytes_sent,
+            'bytes_recv': net_io.bytes_recv,
+            'packets_sent': net_io.packets_sent,
+            'packets_recv': net_io.packets_recv,
+            'errin': net_io.errin,
+            'errout': net_io.errout,
+            'dropin': net_io.dropin,
+            'dropout': net_io.dropout
+        }
+    
+    def _store_metrics(self, metric_type: str, metrics: Dict):
+        """Store metrics in history (bounded deques evict the oldest sample)"""
+        history = self.metrics_history.get(metric_type)
+        if history is None:
+            history = self.metrics_history[metric_type] = deque(maxlen=self.max_metrics_history)
+        history.append(metrics)
+        self._metrics_version += 1
         
-        # Trim history
-        if len(self.metrics_history[metric_type]) > self.max_metrics_history:
-            self.metrics_history[metric_type] = self.metrics_history[metric_type][-self.max_metrics_history:]
+        value = metrics.get(self._ROLLUP_FIELDS.get(metric_type, 'value'))
+        if isinstance(value, (int, float)):
+            self._rollup(metric_type, float(value))
+    
+    def _rollup(self, metric_type: str, value: float):
+        """Fold a sample into the 5-minute and hourly retention tiers"""
+        now = time.time()
+        agg_5m = self._agg_5m.get(metric_type)
+        if agg_5m is None:
+            agg_5m = self._agg_5m[metric_type] = MetricRollup(300, 288)
+            self._agg_1h[metric_type] = MetricRollup(3600, 720)
+        agg_5m.add(now, value)
+        self._agg_1h[metric_type].add(now, value)
     
     async def _check_thresholds(self, metrics: Dict[str, Dict]):
         """Check metrics against thresholds and trigger alerts"""
         # CPU check
         if 'cpu' in metrics and 'cpu_percent' in metrics['cpu']:
             cpu_percent = metrics['cpu']['cpu_percent']
-            if cpu_percent > self.thresholds['cpu_percent']:
-                await self._trigger_alert(
+            if cpu_percent <= self.thresholds['cpu_percent'] - self._alert_hysteresis:
+                self._clear_alert("high_cpu_usage")
+            elif cpu_percent > self.thresholds['cpu_percent']:
+                self._trigger_alert(
                     "high_cpu_usage",
                     f"High CPU usage detected: {cpu_percent:.1f}%",
                     {
@@ -277,8 +899,10 @@ class MonitoringAgent(BaseAgent):
         # Memory check
         if 'memory' in metrics and 'percent' in metrics['memory']:
             mem_percent = metrics['memory']['percent']
-            if mem_percent > self.thresholds['memory_percent']:
-                await self._trigger_alert(
+            if mem_percent <= self.thresholds['memory_percent'] - self._alert_hysteresis:
+                self._clear_alert("high_memory_usage")
+            elif mem_percent > self.thresholds['memory_percent']:
+                self._trigger_alert(
                     "high_memory_usage",
                     f"High memory usage detected: {mem_percent:.1f}%",
                     {
@@ -288,40 +912,108 @@ class MonitoringAgent(BaseAgent):
                     }
                 )
         
-        # Disk check (for each partition)
-        if 'disk' in metrics and isinstance(metrics['disk'], dict) and 'percent' in metrics['disk']:
-            disk_percent = metrics['disk']['percent']
-            if disk_percent > self.thresholds['disk_percent']:
-                await self._trigger_alert(
+        # Disk check (for each partition sampled this cycle)
+        for disk in metrics.get('disk', ()):
+            disk_percent = disk['percent']
+            alert_key = f"high_disk_usage:{disk['mountpoint']}"
+            if disk_percent <= self.thresholds['disk_percent'] - self._alert_hysteresis:
+                self._clear_alert(alert_key)
+            elif disk_percent > self.thresholds['disk_percent']:
+                self._trigger_alert(
                     "high_disk_usage",
-                    f"High disk usage detected on {metrics['disk'].get('mountpoint', 'unknown')}: {disk_percent:.1f}%",
+                    f"High disk usage detected on {disk['mountpoint']}: {disk_percent:.1f}%",
                     {
                         'value': disk_percent,
                         'threshold': self.thresholds['disk_percent'],
-                        'details': metrics['disk']
-                    }
+                        'details': disk
+                    },
+                    alert_key=alert_key
                 )
     
-    async def _trigger_alert(self, alert_type: str, message: str, details: Dict):
-        """Trigger an alert"""
-        alert = AlertMessage(
-            title=f"{alert_type.replace('_', ' ').title()}",
-            description=message,
-            severity="high",
-            source_agent_id=self.id,
-            details=details
-        )
+    def _clear_alert(self, alert_key: str):
+        """Re-arm an alert so its next breach fires immediately"""
+        self._alert_active.discard(alert_key)
+        self._alert_last_fired.pop(alert_key, None)
+    
+    def _trigger_alert(self, alert_type: str, message: str, details: Dict, alert_key: Optional[str] = None):
+        """Queue an alert, suppressing repeats of an active alert within the cooldown
+        
+        ``alert_key`` identifies the alert for debouncing and defaults to ``alert_type``;
+        per-resource alerts (e.g. one per mountpoint) pass a more specific key.
+        """
+        alert_key = alert_key or alert_type
+        now = time.monotonic()
+        if (alert_key in self._alert_active and
+                now - self._alert_last_fired.get(alert_key, float('-inf')) < self._alert_cooldown):
+            return
+        
+        alert = {
+            'alert_type': alert_type,
+            'title': self._ALERT_TITLES.get(alert_type) or _alert_title(alert_type),
+            'message': message,
+            'details': details
+        }
+        try:
+            self._alert_queue.put_nowait(alert)
+        except asyncio.QueueFull:
+            self.logger.warning(f"Alert queue full, dropping alert: {message}")
+            return
+        
+        self._alert_active.add(alert_key)
+        self._alert_last_fired[alert_key] = now
+        self.logger.warning(f"Alert triggered: {message}", extra=details)
+    
+    async def _alert_flush_loop(self):
+        """Broadcast queued alerts, coalescing whatever is pending into one message"""
+        while True:
+            try:
+                first = await self._alert_queue.get()
+                self._alerts_in_hand = [first] + self._drain_alert_queue(self._alert_batch_size - 1)
+                await self._broadcast_alerts(self._alerts_in_hand)
+                self._alerts_in_hand = []
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                self._alerts_in_hand = []
+                self._log_err('alert_broadcast', f"Error broadcasting alerts: {str(e)}")
+    
+    def _drain_alert_queue(self, limit: Optional[int] = None) -> List[Dict]:
+        """Take up to ``limit`` queued alerts without waiting"""
+        alerts = []
+        while limit is None or len(alerts) < limit:
+            try:
+                alerts.append(self._alert_queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        return alerts
+    
+    async def _flush_alert_queue(self):
+        """Broadcast every queued alert immediately, including a batch the consumer held"""
+        alerts = self._alerts_in_hand + self._drain_alert_queue()
+        self._alerts_in_hand = []
+        if alerts:
+            await self._broadcast_alerts(alerts)
+    
+    async def _broadcast_alerts(self, alerts: List[Dict]):
+        """Broadcast one alert as before, or several alerts as a single batch"""
+        if len(alerts) == 1:
+            alert = alerts[0]
+            await self.broadcast(
+                alert['message'],
+                message_type=MessageType.ALERT,
+                severity="high",
+                alert_type=alert['alert_type'],
+                title=alert['title'],
+                details=alert['details']
+            )
+            return
         
-        # Broadcast the alert
         await self.broadcast(
-            message,
+            f"{len(alerts)} alerts triggered",
             message_type=MessageType.ALERT,
             severity="high",
-            alert_type=alert_type,
-            details=details
+            alerts=alerts
         )
-        
-        self.logger.warning(f"Alert triggered: {message}", extra=details)
     
     async def _handle_metric_message(self, message: Message):
         """Handle incoming metric messages from other agents"""
@@ -335,7 +1027,7 @@ class MonitoringAgent(BaseAgent):
             
             # Add timestamp if not provided
             if 'timestamp' not in metric_data:
-                metric_data['timestamp'] = datetime.utcnow().isoformat()
+                metric_data['timestamp'] = datetime.utcnow()
             
             # Store the metric
             self._store_metrics(metric_type, metric_data)
@@ -343,8 +1035,10 @@ class MonitoringAgent(BaseAgent):
             # Check thresholds if applicable
             if 'value' in metric_data and 'threshold' in message.payload:
                 threshold = message.payload['threshold']
-                if metric_data['value'] > threshold:
-                    await self._trigger_alert(
+                if metric_data['value'] <= threshold:
+                    self._clear_alert(f"high_{metric_type}")
+                else:
+                    self._trigger_alert(
                         f"high_{metric_type}",
                         f"{metric_type} threshold exceeded: {metric_data['value']} > {threshold}",
                         {
@@ -355,102 +1049,17 @@ class MonitoringAgent(BaseAgent):
                     )
             
         except Exception as e:
-            self.logger.error(f"Error processing metric message: {str(e)}", exc_info=True)
+            self._log_err('metric_message', f"Error processing metric message: {str(e)}")
     
     async def _handle_command(self, message: Message):
-        """Handle command messages"""
+        """Handle command messages by dispatching to the matching _cmd_* method"""
+        command = ''
         try:
             command = message.payload.get('command', '').lower()
             params = message.payload.get('parameters', {})
             
-            if command == 'get_metrics':
-                # Get metrics with filters
-                metric_type = params.get('type')
-                limit = min(int(params.get('limit', 100)), 1000)
-                
-                if metric_type and metric_type in self.metrics_history:
-                    metrics = self.metrics_history[metric_type][-limit:]
-                else:
-                    metrics = {}
-                    for mtype, values in self.metrics_history.items():
-                        metrics[mtype] = values[-limit:]
-                
-                # Send response
-                response = ResponseMessage(
-                    status="success",
-                    data={"metrics": metrics},
-                    context={"command": command}
-                )
-                await self.send_message(message.header.source_agent_id, response)
-                
-            elif command == 'get_system_info':
-                # Get system information
-                system_info = {
-                    'hostname': socket.gethostname(),
-                    'os': f"{platform.system()} {platform.release()}",
-                    'platform': platform.platform(),
-                    'processor': platform.processor() or 'unknown',
-                    'cpu_count': psutil.cpu_count(),
-                    'boot_time': datetime.fromtimestamp(psutil.boot_time()).isoformat(),
-                    'python_version': platform.python_version()
-                }
-                
-                response = ResponseMessage(
-                    status="success",
-                    data=system_info,
-                    context={"command": command}
-                )
-                await self.send_message(message.header.source_agent_id, response)
-                
-            elif command == 'get_processes':
-                # Get running processes
-                processes = []
-                for proc in psutil.process_iter(['pid', 'name', 'username', 'cpu_percent', 'memory_percent']):
-                    try:
-                        processes.append(proc.info)
-                    except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                        pass
-                
-                # Sort by CPU usage
-                processes = sorted(processes, key=lambda p: p.get('cpu_percent', 0), reverse=True)
-                
-                response = ResponseMessage(
-                    status="success",
-                    data={"processes": processes[:100]},  # Limit to top 100
-                    context={"command": command}
-                )
-                await self.send_message(message.header.source_agent_id, response)
-                
-            elif command == 'set_threshold':
-                # Update a threshold
-                threshold_name = params.get('name')
-                threshold_value = params.get('value')
-                
-                if not threshold_name or threshold_value is None:
-                    raise ValueError("Both 'name' and 'value' parameters are required")
-                
-                if threshold_name in self.thresholds:
-                    old_value = self.thresholds[threshold_name]
-                    self.thresholds[threshold_name] = float(threshold_value)
-                    
-                    response = ResponseMessage(
-                        status="success",
-                        data={
-                            "message": f"Threshold '{threshold_name}' updated from {old_value} to {threshold_value}",
-                            "thresholds": self.thresholds
-                        },
-                        context={"command": command}
-                    )
-                else:
-                    response = ResponseMessage(
-                        status="error",
-                        errors=[f"Unknown threshold: {threshold_name}"],
-                        context={"command": command}
-                    )
-                
-                await self.send_message(message.header.source_agent_id, response)
-                
-            else:
+            handler = self._command_table.get(command)
+            if handler is None:
                 # Unknown command
                 response = ResponseMessage(
                     status="error",
@@ -458,10 +1067,13 @@ class MonitoringAgent(BaseAgent):
                     context={"command": command}
                 )
                 await self.send_message(message.header.source_agent_id, response)
+                return
+            
+            await handler(message, params)
                 
         except Exception as e:
             error_msg = f"Error executing command '{command}': {str(e)}"
-            self.logger.error(error_msg, exc_info=True)
+            self._log_err('handle_command', error_msg)
             response = ResponseMessage(
                 status="error",
                 errors=[error_msg],
@@ -469,6 +1081,196 @@ class MonitoringAgent(BaseAgent):
             )
             await self.send_message(message.header.source_agent_id, response)
     
+    async def _cmd_get_metrics(self, message: Message, params: Dict[str, Any]):
+        """Return stored metrics, optionally for a single metric type
+        
+        ``resolution`` selects raw samples (default) or the '5m'/'1h' rollups, and
+        ``compressed`` returns each series Gorilla-encoded instead of as dicts.
+        """
+        metric_type = params.get('type')
+        limit = min(int(params.get('limit', 100)), 1000)
+        resolution = params.get('resolution', 'raw')
+        compressed = params.get('compressed') is True
+        
+        # Reject unknown keys up front so arbitrary requests cannot grow the view cache
+        known_types = self.metrics_history.keys() | {'disk'}
+        error = None
+        if resolution not in self._METRICS_RESOLUTIONS:
+            error = f"Unknown resolution: {resolution}"
+        elif metric_type is not None and metric_type not in known_types:
+            error = f"Unknown metric type: {metric_type}"
+        if error:
+            response = ResponseMessage(
+                status="error",
+                errors=[error],
+                context={"command": "get_metrics"}
+            )
+            await self.send_message(message.header.source_agent_id, response)
+            return
+        
+        # Dashboards poll the default view repeatedly; reuse it until new samples arrive
+        if limit == self._METRICS_VIEW_LIMIT:
+            key = (metric_type, resolution, compressed)
+            cached = self._metrics_view_cache.get(key)
+            if cached is not None and cached[0] == self._metrics_version:
+                metrics = cached[1]
+            else:
+                metrics = self._build_metrics_view(metric_type, limit, resolution, compressed)
+                self._metrics_view_cache[key] = (self._metrics_version, metrics)
+        else:
+            metrics = self._build_metrics_view(metric_type, limit, resolution, compressed)
+        
+        response = ResponseMessage(
+            status="success",
+            data={"metrics": metrics},
+            context={"command": "get_metrics"}
+        )
+        await self.send_message(message.header.source_agent_id, response)
+    
+    def _build_metrics_view(self, metric_type: Optional[str], limit: int,
+                            resolution: str, compressed: bool) -> Any:
+        """Assemble the metrics returned by get_metrics"""
+        if resolution in ('5m', '1h'):
+            tiers = self._agg_5m if resolution == '5m' else self._agg_1h
+            if metric_type:
+                metrics = tiers[metric_type].tail(limit) if metric_type in tiers else []
+            else:
+                metrics = {mtype: rollup.tail(limit) for mtype, rollup in tiers.items()}
+        elif metric_type == 'disk':
+            metrics = self._disk_metrics_tail(limit)
+        elif metric_type and metric_type in self.metrics_history:
+            metrics = _tail(self.metrics_history[metric_type], limit)
+        else:
+            metrics = {}
+            for mtype, values in self.metrics_history.items():
+                metrics[mtype] = _tail(values, limit)
+            metrics['disk'] = self._disk_metrics_tail(limit)
+        
+        if compressed:
+            metrics = self._compress_metrics(metrics)
+        return metrics
+    
+    @classmethod
+    def _compress_metrics(cls, metrics: Any) -> Any:
+        """Gorilla-encode every sample list in a get_metrics result"""
+        if isinstance(metrics, list):
+            return compress_samples(metrics)
+        return {key: cls._compress_metrics(value) for key, value in metrics.items()}
+    
+    def _disk_metrics_tail(self, limit: int) -> Dict[str, List[Dict]]:
+        """Return the last ``limit`` disk samples for each mountpoint"""
+        return {mountpoint: _tail(history, limit) for mountpoint, history in self._disk_history.items()}
+    
+    async def _cmd_get_system_info(self, message: Message, params: Dict[str, Any]):
+        """Return cached system information"""
+        response = ResponseMessage(
+            status="success",
+            data=dict(self._system_info),
+            context={"command": "get_system_info"}
+        )
+        await self.send_message(message.header.source_agent_id, response)
+    
+    async def _cmd_refresh_system_info(self, message: Message, params: Dict[str, Any]):
+        """Re-read system information (e.g. after CPU hotplug)"""
+        self._system_info = await asyncio.to_thread(self._build_system_info)
+        response = ResponseMessage(
+            status="success",
+            data=dict(self._system_info),
+            context={"command": "refresh_system_info"}
+        )
+        await self.send_message(message.header.source_agent_id, response)
+    
+    async def _cmd_get_processes(self, message: Message, params: Dict[str, Any]):
+        """Return the top 100 running processes by CPU usage"""
+        processes = await asyncio.to_thread(self._collect_processes, 100)
+        
+        response = ResponseMessage(
+            status="success",
+            data={"processes": processes},
+            context={"command": "get_processes"}
+        )
+        await self.send_message(message.header.source_agent_id, response)
+    
+    async def _cmd_set_threshold(self, message: Message, params: Dict[str, Any]):
+        """Update an alert threshold"""
+        threshold_name = params.get('name')
+        threshold_value = params.get('value')
+        
+        if not threshold_name or threshold_value is None:
+            raise ValueError("Both 'name' and 'value' parameters are required")
+        
+        if threshold_name in self.thresholds:
+            old_value = self.thresholds[threshold_name]
+            self.thresholds[threshold_name] = float(threshold_value)
+            
+            response = ResponseMessage(
+                status="success",
+                data={
+                    "message": f"Threshold '{threshold_name}' updated from {old_value} to {threshold_value}",
+                    "thresholds": self.thresholds
+                },
+                context={"command": "set_threshold"}
+            )
+        else:
+            response = ResponseMessage(
+                status="error",
+                errors=[f"Unknown threshold: {threshold_name}"],
+                context={"command": "set_threshold"}
+            )
+        
+        await self.send_message(message.header.source_agent_id, response)
+    
+    @staticmethod
+    def _build_system_info() -> Dict[str, Any]:
+        """Gather static host information"""
+        return {
+            'hostname': socket.gethostname(),
+            'os': f"{platform.system()} {platform.release()}",
+            'platform': platform.platform(),
+            'processor': platform.processor() or 'unknown',
+            'cpu_count': psutil.cpu_count(),
+            'boot_time': datetime.fromtimestamp(psutil.boot_time()).isoformat(),
+            'python_version': platform.python_version()
+        }
+    
+    def _collect_processes(self, limit: int) -> List[Dict[str, Any]]:
+        """Return the ``limit`` processes using the most CPU (blocking, run in a thread)
+        
+        ``psutil.Process`` objects are cached by pid across calls, so each
+        ``cpu_percent()`` measures since the previous request rather than
+        returning 0.0 for a freshly created object.
+        """
+        samples = []
+        with self._proc_cache_lock:
+            current_pids = set(psutil.pids())
+            cache = self._proc_cache
+            for pid in cache.keys() - current_pids:
+                cache.pop(pid, None)
+            
+            for pid in current_pids:
+                proc = cache.get(pid)
+                try:
+                    if proc is None:
+                        proc = cache[pid] = psutil.Process(pid)
+                    # oneshot() reads each /proc entry once for all attributes below
+                    with proc.oneshot():
+                        samples.append((proc.cpu_percent() or 0.0, proc.memory_percent(),
+                                        pid, proc.name(), proc.username()))
+                except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                    cache.pop(pid, None)
+        
+        return [
+            {
+                'pid': pid,
+                'name': name,
+                'username': username,
+                'cpu_percent': cpu_percent,
+                'memory_percent': memory_percent
+            }
+            for cpu_percent, memory_percent, pid, name, username
+            in heapq.nlargest(limit, samples, key=lambda sample: sample[0])
+        ]
+    
     async def _handle_status_update(self, message: Message):
         """Handle status update messages"""
         # Log status updates at debug level
@@ -483,20 +1285,41 @@ class MonitoringAgent(BaseAgent):
             "agent_id": str(self.id),
             "name": self.name,
             "status": self.definition.state.status,
-            "metrics_collected": {k: len(v) for k, v in self.metrics_history.items()},
-            "last_metrics_update": self.last_metrics_update.isoformat() if self.last_metrics_update else None,
+            "metrics_collected": {
+                **{k: len(v) for k, v in self.metrics_history.items()},
+                'disk': sum(len(v) for v in self._disk_history.values())
+            },
+            "last_metrics_update": (datetime.utcfromtimestamp(self.last_metrics_update_ns / 1e9).isoformat()
+                                    if self.last_metrics_update_ns else None),
             "thresholds": self.thresholds,
+            "error_counts": dict(self._err_counts),
             "cpu_usage": self.definition.state.metrics.cpu_usage,
             "memory_usage_mb": self.definition.state.metrics.memory_usage_mb
         }
     
     async def stop(self):
-        """Clean up before stopping"""
+        """Clean up before stopping
+        
+        Collection and alert delivery are stopped and awaited first, so pending
+        alerts go out before the base class's shutdown broadcast.
+        """
+        tasks = [
+            task for task in (getattr(self, name, None)
+                              for name in ('metrics_task', '_sample_task', '_alert_flush_task'))
+            if task is not None and not task.done() and task is not asyncio.current_task()
+        ]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self._flush_alert_queue()
         await super().stop()
-        if hasattr(self, 'metrics_task') and not self.metrics_task.done():
-            self.metrics_task.cancel()
+        self._disk_executor.shutdown(wait=False, cancel_futures=True)
+        if self._procfs is not None:
+            self._procfs.close()
+            self._procfs = None
     
     def __str__(self):
         """String representation of the monitoring agent"""
-        return (f"MonitoringAgent(id={self.id}, metrics={sum(len(v) for v in self.metrics_history.values())}, "
+        total = sum(len(v) for v in self.metrics_history.values()) + sum(len(v) for v in self._disk_history.values())
+        return (f"MonitoringAgent(id={self.id}, metrics={total}, "
                 f"cpu={self.definition.state.metrics.cpu_usage}%)")
@@ -1,9 +1,17 @@
+import aiohttp
 import asyncio
+import heapq
 import logging
+import os
 import re
 import socket
+import time
+from array import array
+from bisect import bisect_left
+from collections import deque
+from itertools import islice
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Set, Tuple
+from typing import Dict, Iterable, List, Optional, Any, Set, Tuple
 from uuid import UUID, uuid4
 
 from ..schemas.agents import AgentDefinition, AgentStatus, AgentCapabilities, AgentType, AgentState, AgentMetrics, AgentIdentity, AgentConfig, AgentDependencies
@@ -11,9 +19,226 @@ from ..schemas.messages import Message, MessageHeader, MessageType, MessagePrior
 from ..schemas.crews import CrewDefinition, CrewMember, CrewRole
 from ..base_agent import BaseAgent
 
+# IPv4 and IPv6 addresses in free-form log text, compiled once at import. They are
+# separate patterns so that lines without a ':' never pay for the IPv6 search.
+_IPV4_RE = re.compile(r'(?a)\b(?:\d{1,3}\.){3}\d{1,3}\b')
+_IPV6_RE = re.compile(r'(?a)\b(?:[A-Fa-f0-9]{1,4}::?){1,7}[A-Fa-f0-9]{1,4}\b')
+
+def _find_ips(text: str) -> List[str]:
+    """Return the IPv4 then IPv6 address candidates found in text"""
+    ips = _IPV4_RE.findall(text)
+    if ':' in text:
+        ips += _IPV6_RE.findall(text)
+    return ips
+
+# Log keywords and the security event type each one raises
+_SECURITY_PATTERNS = {
+    'brute force': 'brute_force_attempt',
+    'password fail': 'failed_login',
+    'unauthorized': 'unauthorized_access',
+    'sql injection': 'sql_injection_attempt',
+    'xss': 'xss_attempt',
+    'exploit': 'exploit_attempt',
+    'malware': 'malware_detected',
+    'virus': 'virus_detected',
+    'backdoor': 'backdoor_detected',
+    'rootkit': 'rootkit_detected'
+}
+_SECURITY_PATTERN_RE = re.compile('|'.join(map(re.escape, _SECURITY_PATTERNS)))
+
+# IPv4 addresses are packed into the IPv4-mapped IPv6 range (::ffff:a.b.c.d)
+# so both families share one integer space
+_IPV4_MAPPED = 0xFFFF << 32
+
+def _parse_ip(ip: str) -> Optional[int]:
+    """Pack an IPv4 or IPv6 address into an int, or return None if it is not valid"""
+    try:
+        return _IPV4_MAPPED | int.from_bytes(socket.inet_pton(socket.AF_INET, ip), 'big')
+    except OSError:
+        pass
+    try:
+        return int.from_bytes(socket.inet_pton(socket.AF_INET6, ip), 'big')
+    except OSError:
+        return None
+
+def _format_ip(packed: int) -> str:
+    """Turn an address packed by :func:`_parse_ip` back into its text form"""
+    if packed >> 32 == 0xFFFF:
+        return socket.inet_ntop(socket.AF_INET, (packed & 0xFFFFFFFF).to_bytes(4, 'big'))
+    return socket.inet_ntop(socket.AF_INET6, packed.to_bytes(16, 'big'))
+
+# Known bad IPs merged into the threat intelligence on every update
+_SEED_THREATS = frozenset(_parse_ip(ip) for ip in (
+    "1.2.3.4", "5.6.7.8", "9.10.11.12",
+    "185.220.101.4",  # Known Tor exit node
+    "45.155.205.233",  # Known malicious IP
+    "91.219.236.197"   # Known scanner
+))
+
+# Netmask for every prefix length of a packed (128-bit) address
+_PREFIX_MASKS = [((1 << length) - 1) << (128 - length) for length in range(129)]
+
+def _parse_network(network: str) -> Optional[Tuple[int, int]]:
+    """Parse an address or CIDR block into ``(packed network, 128-bit prefix length)``
+    
+    IPv4 prefix lengths are shifted by 96 to match the IPv4-mapped packing. Host
+    bits are cleared, so ``10.0.0.1/8`` is the same entry as ``10.0.0.0/8``.
+    Returns None if the text is not a valid address or block.
+    """
+    address, _, length = network.partition('/')
+    packed = _parse_ip(address.strip())
+    if packed is None:
+        return None
+    is_v4 = packed >> 32 == 0xFFFF
+    if not length:
+        return packed, 128
+    if not length.isdigit() or int(length) > (32 if is_v4 else 128):
+        return None
+    prefixlen = int(length) + 96 if is_v4 else int(length)
+    return packed & _PREFIX_MASKS[prefixlen], prefixlen
+
+def _format_network(packed: int, prefixlen: int) -> str:
+    """Format an entry produced by :func:`_parse_network`"""
+    if prefixlen == 128:
+        return _format_ip(packed)
+    if packed >> 32 == 0xFFFF and prefixlen >= 96:
+        return f"{_format_ip(packed)}/{prefixlen - 96}"
+    return f"{_format_ip(packed)}/{prefixlen}"
+
+class IPNetworkSet:
+    """Set of IP addresses and CIDR blocks with containment checks for single addresses
+    
+    Entries are grouped by prefix length, so a lookup masks the address once per
+    prefix length in use and probes a hash set, rather than scanning every block.
+    """
+    
+    def __init__(self):
+        self._by_prefix: Dict[int, Set[int]] = {}
+    
+    def add(self, packed: int, prefixlen: int = 128):
+        self._by_prefix.setdefault(prefixlen, set()).add(packed & _PREFIX_MASKS[prefixlen])
+    
+    def discard(self, packed: int, prefixlen: int = 128):
+        networks = self._by_prefix.get(prefixlen)
+        if networks is not None:
+            networks.discard(packed & _PREFIX_MASKS[prefixlen])
+            if not networks:
+                del self._by_prefix[prefixlen]
+    
+    def __contains__(self, packed: int) -> bool:
+        for prefixlen, networks in self._by_prefix.items():
+            if packed & _PREFIX_MASKS[prefixlen] in networks:
+                return True
+        return False
+    
+    def __len__(self) -> int:
+        return sum(len(networks) for networks in self._by_prefix.values())
+    
+    def __iter__(self):
+        """Yield ``(packed network, prefix length)`` entries"""
+        for prefixlen, networks in self._by_prefix.items():
+            for packed in networks:
+                yield packed, prefixlen
+
+class CompactIPSet:
+    """Set of packed IPs that keeps IPv4 addresses in a sorted 32-bit array
+    
+    Threat feeds are mostly IPv4, so those entries cost 4 bytes each instead of
+    a Python int plus a hash-table slot, and are found by binary search. The
+    sparse IPv6 remainder stays in a regular set.
+    """
+    
+    def __init__(self):
+        self._v4 = array('I')
+        self._v6: Set[int] = set()
+    
+    def __contains__(self, packed: int) -> bool:
+        if packed >> 32 == 0xFFFF:
+            value = packed & 0xFFFFFFFF
+            index = bisect_left(self._v4, value)
+            return index < len(self._v4) and self._v4[index] == value
+        return packed in self._v6
+    
+    def __len__(self) -> int:
+        return len(self._v4) + len(self._v6)
+    
+    def __iter__(self):
+        for value in self._v4:
+            yield _IPV4_MAPPED | value
+        yield from self._v6
+    
+    def update(self, packed_ips: Iterable[int]) -> int:
+        """Add addresses and return how many of them were new"""
+        before = len(self)
+        new_v4 = set()
+        for packed in packed_ips:
+            if packed >> 32 == 0xFFFF:
+                new_v4.add(packed & 0xFFFFFFFF)
+            else:
+                self._v6.add(packed)
+        fresh = sorted(value for value in new_v4 if _IPV4_MAPPED | value not in self)
+        if fresh:
+            self._v4 = array('I', heapq.merge(self._v4, fresh))
+        return len(self) - before
+
+class _EventIdPool:
+    """Hands out random 16-byte event ids, reading OS entropy in batches"""
+    
+    def __init__(self, batch_size: int = 256):
+        self._batch_bytes = 16 * batch_size
+        self._buffer = b''
+        self._pos = 0
+    
+    def next(self) -> bytes:
+        if self._pos >= len(self._buffer):
+            self._buffer = os.urandom(self._batch_bytes)
+            self._pos = 0
+        self._pos += 16
+        return self._buffer[self._pos - 16:self._pos]
+
+class SecurityEvent:
+    """A recorded security event
+    
+    Stored with ``__slots__`` rather than as a dict, since up to
+    ``max_security_events`` of them stay in memory. The id and timestamp are kept
+    raw (16 random bytes and epoch seconds) and only formatted by :meth:`to_dict`.
+    """
+    
+    __slots__ = ('event_id', 'timestamp', 'type', 'severity', 'source', 'details', 'actions_taken')
+    
+    def __init__(self, event_id: bytes, event_type: str, severity: str, source: str, details: Dict):
+        self.event_id = event_id
+        self.timestamp = time.time()
+        self.type = event_type
+        self.severity = severity
+        self.source = source
+        self.details = details
+        self.actions_taken: Optional[List[str]] = None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the event in its message form"""
+        event = {
+            "event_id": str(UUID(bytes=self.event_id, version=4)),
+            "timestamp": datetime.utcfromtimestamp(self.timestamp).isoformat(),
+            "type": self.type,
+            "severity": self.severity,
+            "source": self.source,
+            "details": self.details
+        }
+        if self.actions_taken is not None:
+            event["actions_taken"] = self.actions_taken
+        return event
+
 class SecurityAgent(BaseAgent):
     """Specialized agent for security monitoring and response"""
     
+    _EXTRA_HANDLERS = {
+        MessageType.LOG: '_handle_log_message',
+        MessageType.ALERT: '_handle_alert_message',
+        MessageType.COMMAND: '_handle_command',
+        MessageType.STATUS_UPDATE: '_handle_status_update'
+    }
+    
     def __init__(self, agent_definition: Optional[AgentDefinition] = None):
         """Initialize the security agent"""
         if agent_definition is None:
@@ -23,11 +248,22 @@ class SecurityAgent(BaseAgent):
         
         # Security monitoring state
         self.suspicious_ips: Dict[str, Dict] = {}
-        self.failed_login_attempts: Dict[str, List[datetime]] = {}
-        self.known_threats: Set[str] = set()
-        self.security_events: List[Dict] = []
-        self.whitelist: Set[str] = set()
-        self.blacklist: Set[str] = set()
+        # IP collections hold addresses packed by _parse_ip
+        # Failed login times per IP, as time.monotonic() values, oldest first
+        self.failed_login_attempts: Dict[int, deque] = {}
+        self.known_threats = CompactIPSet()
+        # Most recent security events, oldest evicted first
+        self.max_security_events = 10000
+        self.security_events: deque = deque(maxlen=self.max_security_events)
+        self._event_ids = _EventIdPool()
+        # The same events indexed by type and by severity, in arrival order
+        self._events_by_type: Dict[str, deque] = {}
+        self._events_by_severity: Dict[str, deque] = {}
+        self.whitelist: Set[int] = set()
+        # The blacklist also accepts CIDR blocks
+        self.blacklist = IPNetworkSet()
+        # Text forms of the IP collections served by the get_* commands
+        self._formatted_cache: Dict[str, List[str]] = {}
         
         # Rate limiting
         self.login_attempt_window = timedelta(minutes=5)
@@ -35,13 +271,35 @@ class SecurityAgent(BaseAgent):
         
         # Threat intelligence
         self.threat_intel_sources = [
-            "https://www.blocklist.de/en/export.html",
+            "https://lists.blocklist.de/lists/all.txt",
             "https://check.torproject.org/exit-addresses",
             "https://www.binarydefense.com/banlist.txt"
         ]
+        # Feeds are fetched concurrently over one shared session; conditional
+        # requests reuse the last parsed result when a feed has not changed
+        self._http: Optional[aiohttp.ClientSession] = None
+        self._feed_semaphore = asyncio.Semaphore(5)
+        self._feed_timeout = aiohttp.ClientTimeout(total=30)
+        self._feed_validators: Dict[str, Dict[str, str]] = {}
+        self._feed_ips: Dict[str, Set[int]] = {}
+        self.threat_intel_interval = 3600  # seconds
+        self.threat_intel_last_updated: Optional[datetime] = None
         
-        # Update threat intelligence on startup
-        self.update_task = asyncio.create_task(self._update_threat_intelligence())
+        # Command name -> handler, looked up once per command message
+        self._command_table = {
+            'get_security_events': self._cmd_get_security_events,
+            'add_to_blacklist': self._cmd_add_to_blacklist,
+            'remove_from_blacklist': self._cmd_remove_from_blacklist,
+            'get_blacklist': self._cmd_get_blacklist,
+            'get_whitelist': self._cmd_get_whitelist,
+            'add_to_whitelist': self._cmd_add_to_whitelist,
+            'remove_from_whitelist': self._cmd_remove_from_whitelist,
+            'get_threat_intel': self._cmd_get_threat_intel,
+            'update_threat_intel': self._cmd_update_threat_intel
+        }
+        
+        # Threat intelligence refresh, started by start() and then run once per interval
+        self.update_task: Optional[asyncio.Task] = None
     
     @classmethod
     def _create_default_definition(cls) -> AgentDefinition:
@@ -94,116 +352,217 @@ class SecurityAgent(BaseAgent):
             state=state
         )
     
-    def _register_message_handlers(self) -> Dict[str, Any]:
-        """Register message handlers specific to the security agent"""
-        return {
-            MessageType.LOG: self._handle_log_message,
-            MessageType.ALERT: self._handle_alert_message,
-            MessageType.COMMAND: self._handle_command,
-            MessageType.STATUS_UPDATE: self._handle_status_update
-        }
-    
     async def _do_background_work(self):
         """Perform background security tasks"""
-        # Rotate logs if needed
-        if len(self.security_events) > 10000:  # Keep last 10k events in memory
-            self.security_events = self.security_events[-10000:]
-        
         # Clean up old failed login attempts
-        self._cleanup_failed_logins()
-        
-        # Update threat intelligence periodically
-        if self.update_task.done():
-            self.update_task = asyncio.create_task(self._update_threat_intelligence())
+        self._cleanup_failed_logins(time.monotonic())
+    
+    async def start(self):
+        """Start the agent and its threat intelligence refresh"""
+        await super().start()
+        if self.running and (self.update_task is None or self.update_task.done()):
+            self.update_task = asyncio.create_task(self._threat_intel_loop())
+    
+    async def _threat_intel_loop(self):
+        """Refresh threat intelligence on a fixed, drift-free cadence"""
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                deadline = loop.time() + self.threat_intel_interval
+                await self._update_threat_intelligence()
+                await asyncio.sleep(max(0.0, deadline - loop.time()))
+            except asyncio.CancelledError:
+                break
     
     async def _update_threat_intelligence(self):
         """Update threat intelligence from external sources"""
         try:
             self.logger.info("Updating threat intelligence...")
             
-            # In a real implementation, this would fetch from external sources
-            # For now, we'll just simulate it with some known bad IPs
-            new_threats = {
-                "1.2.3.4", "5.6.7.8", "9.10.11.12",
-                "185.220.101.4",  # Known Tor exit node
-                "45.155.205.233",  # Known malicious IP
-                "91.219.236.197"   # Known scanner
-            }
+            async with asyncio.TaskGroup() as group:
+                fetches = [group.create_task(self._fetch_feed_or_empty(url))
+                           for url in self.threat_intel_sources]
             
-            added = new_threats - self.known_threats
-            if added:
-                self.known_threats.update(added)
-                self.logger.info(f"Added {len(added)} new threats to intelligence")
+            # Rebuild from the seed list and the current feeds, so addresses that
+            # drop out of a feed (e.g. retired Tor exits) are dropped here too
+            new_threats = set(_SEED_THREATS)
+            feed_sizes = {}
+            for url, fetch in zip(self.threat_intel_sources, fetches):
+                feed_ips = fetch.result()
+                feed_sizes[url] = len(feed_ips)
+                new_threats |= feed_ips
+            previous = self.known_threats
+            added = sum(1 for ip in new_threats if ip not in previous)
+            self.known_threats = CompactIPSet()
+            self.known_threats.update(new_threats)
+            removed = len(previous) - (len(self.known_threats) - added)
+            if added or removed:
+                self._formatted_cache.pop('known_threats', None)
+                self.logger.info(f"Threat intelligence updated: {added} added, {removed} removed")
                 
-                # Notify about new threats
+                # One notification for the whole refresh cycle, however many feeds changed
                 await self.broadcast(
-                    f"Added {len(added)} new threats to intelligence database",
+                    f"Threat intelligence updated: {added} added, {removed} removed",
                     message_type=MessageType.STATUS_UPDATE,
-                    priority=MessagePriority.NORMAL
+                    priority=MessagePriority.NORMAL,
+                    details={
+                        "added": added,
+                        "removed": removed,
+                        "total": len(self.known_threats),
+                        "feeds": feed_sizes
+                    }
                 )
             
             # Update metrics
             self.definition.state.metrics.metadata["threat_intel_count"] = len(self.known_threats)
+            self._status_dirty = True
+            self.threat_intel_last_updated = datetime.utcnow()
             
         except Exception as e:
             self.logger.error(f"Error updating threat intelligence: {str(e)}", exc_info=True)
-            
-        # Schedule next update in 1 hour
-        await asyncio.sleep(3600)
-    
-    def _cleanup_failed_logins(self):
-        """Remove old failed login attempts"""
-        cutoff = datetime.utcnow() - self.login_attempt_window
-        for ip, attempts in list(self.failed_login_attempts.items()):
-            # Remove old attempts
-            recent_attempts = [t for t in attempts if t > cutoff]
-            
-            if recent_attempts:
-                self.failed_login_attempts[ip] = recent_attempts
-            else:
-                del self.failed_login_attempts[ip]
     
-    def _is_suspicious_ip(self, ip: str) -> bool:
-        """Check if an IP is suspicious"""
-        # Check blacklist
-        if ip in self.blacklist:
-            return True
+    async def _fetch_feed_or_empty(self, url: str) -> Set[int]:
+        """Fetch one feed, logging a failure instead of cancelling the other fetches
+        
+        A failed fetch keeps the feed's last good result, so an outage does not
+        drop its addresses from the rebuilt threat set.
+        """
+        try:
+            return await self._fetch_feed(url)
+        except Exception as e:
+            self.logger.warning(f"Failed to fetch threat feed {url}: {e!r}")
+            return self._feed_ips.get(url, set())
+    
+    async def _fetch_feed(self, url: str) -> Set[int]:
+        """Download one threat feed and return the IPs it lists"""
+        if self._http is None or self._http.closed:
+            self._http = aiohttp.ClientSession(timeout=self._feed_timeout)
+        
+        async with self._feed_semaphore:
+            validators = self._feed_validators.get(url, {})
+            headers = {}
+            if 'etag' in validators:
+                headers['If-None-Match'] = validators['etag']
+            if 'last_modified' in validators:
+                headers['If-Modified-Since'] = validators['last_modified']
             
-        # Check whitelist
-        if ip in self.whitelist:
+            async with self._http.get(url, headers=headers) as response:
+                if response.status == 304:
+                    return self._feed_ips.get(url, set())
+                response.raise_for_status()
+                text = await response.text()
+                validators = {}
+                if response.headers.get('ETag'):
+                    validators['etag'] = response.headers['ETag']
+                if response.headers.get('Last-Modified'):
+                    validators['last_modified'] = response.headers['Last-Modified']
+        
+        ips = {_parse_ip(ip) for ip in _find_ips(text)}
+        ips.discard(None)
+        self._feed_validators[url] = validators
+        self._feed_ips[url] = ips
+        return ips
+    
+    def _cleanup_failed_logins(self, now: Optional[float] = None):
+        """Remove old failed login attempts, given the caller's time.monotonic() reading"""
+        cutoff = (now if now is not None else time.monotonic()) - self.login_attempt_window.total_seconds()
+        expired = []
+        for ip, attempts in self.failed_login_attempts.items():
+            # Attempts are appended in time order, so expired ones sit at the front
+            while attempts and attempts[0] <= cutoff:
+                attempts.popleft()
+            if not attempts:
+                expired.append(ip)
+        # Delete after iterating instead of snapshotting the whole table up front
+        for ip in expired:
+            del self.failed_login_attempts[ip]
+    
+    def _record_failed_login(self, ip: int):
+        """Record a failed login attempt from an IP (packed by _parse_ip)"""
+        attempts = self.failed_login_attempts.get(ip)
+        if attempts is None:
+            attempts = self.failed_login_attempts[ip] = deque(maxlen=self.max_login_attempts * 4)
+        attempts.append(time.monotonic())
+    
+    def _too_many_failed_logins(self, ip: int, now: Optional[float] = None) -> bool:
+        """Check whether an IP reached max_login_attempts within the login window"""
+        attempts = self.failed_login_attempts.get(ip)
+        if not attempts or len(attempts) < self.max_login_attempts:
             return False
-            
-        # Check known threats
-        if ip in self.known_threats:
-            return True
-            
-        # Check for too many failed login attempts
-        if ip in self.failed_login_attempts:
-            recent_attempts = [
-                t for t in self.failed_login_attempts[ip]
-                if t > datetime.utcnow() - self.login_attempt_window
-            ]
-            if len(recent_attempts) >= self.max_login_attempts:
-                return True
-                
-        return False
+        # The max_login_attempts-th most recent attempt falls inside the window
+        if now is None:
+            now = time.monotonic()
+        return attempts[-self.max_login_attempts] > now - self.login_attempt_window.total_seconds()
+    
+    def _find_suspicious_ips(self, ips: Dict[int, str], now: Optional[float] = None) -> Set[int]:
+        """Check a batch of packed IPs at once and return the suspicious ones
+        
+        Whitelist and failed-login lookups are set intersections over the whole
+        batch; only the remainder with failed-login history is checked one by one.
+        """
+        candidates = ips.keys()
+        suspicious = {ip for ip in candidates if ip in self.blacklist}
+        suspicious |= {ip for ip in candidates if ip in self.known_threats} - self.whitelist
+        for ip in (candidates & self.failed_login_attempts.keys()) - suspicious - self.whitelist:
+            if self._too_many_failed_logins(ip, now):
+                suspicious.add(ip)
+        return suspicious
     
-    def _record_security_event(self, event_type: str, severity: str, details: Dict, source: str = "security_agent") -> Dict:
+    def _record_security_event(self, event_type: str, severity: str, details: Dict, source: str = "security_agent") -> SecurityEvent:
         """Record a security event"""
-        event = {
-            "event_id": str(uuid4()),
-            "timestamp": datetime.utcnow().isoformat(),
-            "type": event_type,
-            "severity": severity,
-            "source": source,
-            "details": details
-        }
+        event = SecurityEvent(self._event_ids.next(), event_type, severity, source, details)
         
+        if len(self.security_events) == self.max_security_events:
+            self._unindex_event(self.security_events[0])
         self.security_events.append(event)
-        self.logger.info(f"Security event: {event_type} - {severity}", extra={"event": event})
+        self._index_event(self._events_by_type, event_type, event)
+        self._index_event(self._events_by_severity, severity, event)
+        # Skip message formatting and the extra dict when INFO is filtered out
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info(f"Security event: {event_type} - {severity}", extra={"event": event})
         
         return event
     
+    @staticmethod
+    def _index_event(index: Dict[str, deque], key: str, event: SecurityEvent):
+        events = index.get(key)
+        if events is None:
+            events = index[key] = deque()
+        events.append(event)
+    
+    def _unindex_event(self, event: SecurityEvent):
+        """Drop an event about to be evicted from the ring buffer from both indices
+        
+        Events are evicted oldest first, so it is always the head of its index entries.
+        """
+        for index, key in ((self._events_by_type, event.type),
+                           (self._events_by_severity, event.severity)):
+            events = index[key]
+            events.popleft()
+            if not events:
+                del index[key]
+    
+    def _query_events(self, event_type: Optional[str], severity: Optional[str], limit: int) -> List[SecurityEvent]:
+        """Return up to ``limit`` of the newest matching events, oldest first"""
+        if event_type and severity:
+            by_type = self._events_by_type.get(event_type, ())
+            by_severity = self._events_by_severity.get(severity, ())
+            # Walk the smaller index and filter on the other attribute
+            if len(by_type) <= len(by_severity):
+                events = (e for e in reversed(by_type) if e.severity == severity)
+            else:
+                events = (e for e in reversed(by_severity) if e.type == event_type)
+        elif event_type:
+            events = reversed(self._events_by_type.get(event_type, ()))
+        elif severity:
+            events = reversed(self._events_by_severity.get(severity, ()))
+        else:
+            events = reversed(self.security_events)
+        
+        events = list(islice(events, limit))
+        events.reverse()
+        return events
+    
     async def _handle_log_message(self, message: Message):
         """Handle log messages for security analysis"""
         try:
@@ -216,13 +575,17 @@ class SecurityAgent(BaseAgent):
             if log_level not in ['warning', 'error', 'critical']:
                 return
             
-            # Extract IPs from log message
-            ip_pattern = r'\b(?:\d{1,3}\.){3}\d{1,3}\b|\b(?:[A-Fa-f0-9]{1,4}::?){1,7}[A-Fa-f0-9]{1,4}\b'
-            ips = re.findall(ip_pattern, log_message)
+            # Extract IPs from log message, keyed by packed form (first spelling wins)
+            ips: Dict[int, str] = {}
+            for ip in _find_ips(log_message):
+                packed = _parse_ip(ip)
+                if packed is not None:
+                    ips.setdefault(packed, ip)
             
-            # Check each IP
-            for ip in ips:
-                if self._is_suspicious_ip(ip):
+            # Check all IPs in one batch, in message order
+            suspicious = self._find_suspicious_ips(ips, time.monotonic()) if ips else ()
+            for packed, ip in ips.items():
+                if packed in suspicious:
                     # Record security event
                     event = self._record_security_event(
                         event_type="suspicious_ip_detected",
@@ -238,22 +601,10 @@ class SecurityAgent(BaseAgent):
                     # Take action based on severity
                     await self._respond_to_threat(ip, event)
             
-            # Check for security-related patterns
-            security_patterns = {
-                'brute force': 'brute_force_attempt',
-                'password fail': 'failed_login',
-                'unauthorized': 'unauthorized_access',
-                'sql injection': 'sql_injection_attempt',
-                'xss': 'xss_attempt',
-                'exploit': 'exploit_attempt',
-                'malware': 'malware_detected',
-                'virus': 'virus_detected',
-                'backdoor': 'backdoor_detected',
-                'rootkit': 'rootkit_detected'
-            }
-            
-            for pattern, event_type in security_patterns.items():
-                if pattern in log_message.lower():
+            # Check for security-related patterns in a single pass over the message
+            matched = set(_SECURITY_PATTERN_RE.findall(log_message.lower()))
+            for pattern, event_type in _SECURITY_PATTERNS.items():
+                if pattern in matched:
                     event = self._record_security_event(
                         event_type=event_type,
                         severity="high" if 'attempt' in event_type else "critical",
@@ -265,32 +616,40 @@ class SecurityAgent(BaseAgent):
                         source=source
                     )
                     
+                    # Count failed logins against the addresses named in the message
+                    if event_type == 'failed_login':
+                        for packed in ips:
+                            self._record_failed_login(packed)
+                    
                     # Take action
                     await self._respond_to_threat("", event)
         
         except Exception as e:
             self.logger.error(f"Error processing log message: {str(e)}", exc_info=True)
     
-    async def _respond_to_threat(self, ip: str, event: Dict):
+    async def _respond_to_threat(self, ip: str, event: SecurityEvent):
         """Take appropriate action in response to a detected threat"""
         try:
-            event_type = event.get('type', '')
-            severity = event.get('severity', 'medium')
+            event_type = event.type
+            severity = event.severity
             
             # Default actions based on event type and severity
             actions = []
             
             if 'brute_force' in event_type or 'failed_login' in event_type:
                 # Add IP to blacklist temporarily
-                self.blacklist.add(ip)
-                actions.append(f"Temporarily blacklisted IP: {ip}")
+                packed = _parse_ip(ip)
+                if packed is not None:
+                    self.blacklist.add(packed)
+                    self._formatted_cache.pop('blacklist', None)
+                    actions.append(f"Temporarily blacklisted IP: {ip}")
                 
                 # Notify administrators
                 await self.broadcast(
                     f"Potential brute force attempt from {ip}",
                     message_type=MessageType.ALERT,
                     severity=severity,
-                    details=event.get('details', {})
+                    details=event.details
                 )
             
             elif 'malware' in event_type or 'virus' in event_type:
@@ -302,15 +661,16 @@ class SecurityAgent(BaseAgent):
                     "Malware detected. Isolating affected systems.",
                     message_type=MessageType.ALERT,
                     severity="critical",
-                    details=event.get('details', {})
+                    details=event.details
                 )
             
             # Log the actions taken
-            event['actions_taken'] = actions
-            self.logger.warning(
-                f"Responded to {event_type} threat",
-                extra={"event": event, "actions": actions}
-            )
+            event.actions_taken = actions
+            if self.logger.isEnabledFor(logging.WARNING):
+                self.logger.warning(
+                    f"Responded to {event_type} threat",
+                    extra={"event": event, "actions": actions}
+                )
             
         except Exception as e:
             self.logger.error(f"Error responding to threat: {str(e)}", exc_info=True)
@@ -324,15 +684,16 @@ class SecurityAgent(BaseAgent):
             description = alert.get('description', '')
             
             # Log the alert
-            self.logger.warning(
-                f"SECURITY ALERT: {title}",
-                extra={
-                    "severity": severity,
-                    "description": description,
-                    "source_agent": str(message.header.source_agent_id),
-                    "recommended_actions": alert.get('recommended_actions', [])
-                }
-            )
+            if self.logger.isEnabledFor(logging.WARNING):
+                self.logger.warning(
+                    f"SECURITY ALERT: {title}",
+                    extra={
+                        "severity": severity,
+                        "description": description,
+                        "source_agent": str(message.header.source_agent_id),
+                        "recommended_actions": alert.get('recommended_actions', [])
+                    }
+                )
             
             # Record as security event
             self._record_security_event(
@@ -351,142 +712,14 @@ class SecurityAgent(BaseAgent):
             self.logger.error(f"Error processing alert message: {str(e)}", exc_info=True)
     
     async def _handle_command(self, message: Message):
-        """Handle command messages"""
+        """Handle command messages by dispatching to the matching _cmd_* method"""
+        command = ''
         try:
             command = message.payload.get('command', '').lower()
             params = message.payload.get('parameters', {})
             
-            if command == 'get_security_events':
-                # Get security events with filters
-                event_type = params.get('type')
-                severity = params.get('severity')
-                limit = min(int(params.get('limit', 100)), 1000)
-                
-                events = self.security_events
-                
-                if event_type:
-                    events = [e for e in events if e.get('type') == event_type]
-                if severity:
-                    events = [e for e in events if e.get('severity') == severity]
-                
-                # Apply limit
-                events = events[-limit:]
-                
-                # Send response
-                response = ResponseMessage(
-                    status="success",
-                    data={"events": events, "count": len(events)},
-                    context={"command": command}
-                )
-                await self.send_message(message.header.source_agent_id, response)
-                
-            elif command == 'add_to_blacklist':
-                # Add IP to blacklist
-                ip = params.get('ip')
-                if not ip:
-                    raise ValueError("IP address is required")
-                
-                self.blacklist.add(ip)
-                
-                response = ResponseMessage(
-                    status="success",
-                    data={"message": f"Added {ip} to blacklist"},
-                    context={"command": command}
-                )
-                await self.send_message(message.header.source_agent_id, response)
-                
-            elif command == 'remove_from_blacklist':
-                # Remove IP from blacklist
-                ip = params.get('ip')
-                if not ip:
-                    raise ValueError("IP address is required")
-                
-                if ip in self.blacklist:
-                    self.blacklist.remove(ip)
-                    
-                response = ResponseMessage(
-                    status="success",
-                    data={"message": f"Removed {ip} from blacklist"},
-                    context={"command": command}
-                )
-                await self.send_message(message.header.source_agent_id, response)
-                
-            elif command == 'get_blacklist':
-                # Get current blacklist
-                response = ResponseMessage(
-                    status="success",
-                    data={"blacklist": list(self.blacklist)},
-                    context={"command": command}
-                )
-                await self.send_message(message.header.source_agent_id, response)
-                
-            elif command == 'get_whitelist':
-                # Get current whitelist
-                response = ResponseMessage(
-                    status="success",
-                    data={"whitelist": list(self.whitelist)},
-                    context={"command": command}
-                )
-                await self.send_message(message.header.source_agent_id, response)
-                
-            elif command == 'add_to_whitelist':
-                # Add IP to whitelist
-                ip = params.get('ip')
-                if not ip:
-                    raise ValueError("IP address is required")
-                
-                self.whitelist.add(ip)
-                
-                response = ResponseMessage(
-                    status="success",
-                    data={"message": f"Added {ip} to whitelist"},
-                    context={"command": command}
-                )
-                await self.send_message(message.header.source_agent_id, response)
-                
-            elif command == 'remove_from_whitelist':
-                # Remove IP from whitelist
-                ip = params.get('ip')
-                if not ip:
-                    raise ValueError("IP address is required")
-                
-                if ip in self.whitelist:
-                    self.whitelist.remove(ip)
-                    
-                response = ResponseMessage(
-                    status="success",
-                    data={"message": f"Removed {ip} from whitelist"},
-                    context={"command": command}
-                )
-                await self.send_message(message.header.source_agent_id, response)
-                
-            elif command == 'get_threat_intel':
-                # Get current threat intelligence
-                response = ResponseMessage(
-                    status="success",
-                    data={
-                        "known_threats": list(self.known_threats),
-                        "threat_count": len(self.known_threats),
-                        "last_updated": self.update_task.done() and self.update_task.result() or None
-                    },
-                    context={"command": command}
-                )
-                await self.send_message(message.header.source_agent_id, response)
-                
-            elif command == 'update_threat_intel':
-                # Force update of threat intelligence
-                if not self.update_task.done():
-                    self.update_task.cancel()
-                self.update_task = asyncio.create_task(self._update_threat_intelligence())
-                
-                response = ResponseMessage(
-                    status="success",
-                    data={"message": "Updating threat intelligence..."},
-                    context={"command": command}
-                )
-                await self.send_message(message.header.source_agent_id, response)
-                
-            else:
+            handler = self._command_table.get(command)
+            if handler is None:
                 # Unknown command
                 response = ResponseMessage(
                     status="error",
@@ -494,6 +727,9 @@ class SecurityAgent(BaseAgent):
                     context={"command": command}
                 )
                 await self.send_message(message.header.source_agent_id, response)
+                return
+            
+            await handler(message, params)
                 
         except Exception as e:
             error_msg = f"Error executing command '{command}': {str(e)}"
@@ -505,13 +741,169 @@ class SecurityAgent(BaseAgent):
             )
             await self.send_message(message.header.source_agent_id, response)
     
+    async def _cmd_get_security_events(self, message: Message, params: Dict[str, Any]):
+        """Return recent security events, optionally filtered by type and severity"""
+        event_type = params.get('type')
+        severity = params.get('severity')
+        limit = min(int(params.get('limit', 100)), 1000)
+        
+        events = [e.to_dict() for e in self._query_events(event_type, severity, limit)]
+        
+        response = ResponseMessage(
+            status="success",
+            data={"events": events, "count": len(events)},
+            context={"command": "get_security_events"}
+        )
+        await self.send_message(message.header.source_agent_id, response)
+    
+    async def _cmd_add_to_blacklist(self, message: Message, params: Dict[str, Any]):
+        """Add an IP address or CIDR block to the blacklist"""
+        ip = params.get('ip')
+        if not ip:
+            raise ValueError("IP address is required")
+        
+        self.blacklist.add(*self._require_network(ip))
+        self._formatted_cache.pop('blacklist', None)
+        
+        response = ResponseMessage(
+            status="success",
+            data={"message": f"Added {ip} to blacklist"},
+            context={"command": "add_to_blacklist"}
+        )
+        await self.send_message(message.header.source_agent_id, response)
+    
+    async def _cmd_remove_from_blacklist(self, message: Message, params: Dict[str, Any]):
+        """Remove an IP address or CIDR block from the blacklist"""
+        ip = params.get('ip')
+        if not ip:
+            raise ValueError("IP address is required")
+        
+        self.blacklist.discard(*self._require_network(ip))
+        self._formatted_cache.pop('blacklist', None)
+        
+        response = ResponseMessage(
+            status="success",
+            data={"message": f"Removed {ip} from blacklist"},
+            context={"command": "remove_from_blacklist"}
+        )
+        await self.send_message(message.header.source_agent_id, response)
+    
+    async def _cmd_get_blacklist(self, message: Message, params: Dict[str, Any]):
+        """Return the current blacklist"""
+        response = ResponseMessage(
+            status="success",
+            data={"blacklist": self._formatted('blacklist')},
+            context={"command": "get_blacklist"}
+        )
+        await self.send_message(message.header.source_agent_id, response)
+    
+    async def _cmd_get_whitelist(self, message: Message, params: Dict[str, Any]):
+        """Return the current whitelist"""
+        response = ResponseMessage(
+            status="success",
+            data={"whitelist": self._formatted('whitelist')},
+            context={"command": "get_whitelist"}
+        )
+        await self.send_message(message.header.source_agent_id, response)
+    
+    async def _cmd_add_to_whitelist(self, message: Message, params: Dict[str, Any]):
+        """Add an IP address to the whitelist"""
+        ip = params.get('ip')
+        if not ip:
+            raise ValueError("IP address is required")
+        
+        self.whitelist.add(self._require_ip(ip))
+        self._formatted_cache.pop('whitelist', None)
+        
+        response = ResponseMessage(
+            status="success",
+            data={"message": f"Added {ip} to whitelist"},
+            context={"command": "add_to_whitelist"}
+        )
+        await self.send_message(message.header.source_agent_id, response)
+    
+    async def _cmd_remove_from_whitelist(self, message: Message, params: Dict[str, Any]):
+        """Remove an IP address from the whitelist"""
+        ip = params.get('ip')
+        if not ip:
+            raise ValueError("IP address is required")
+        
+        self.whitelist.discard(self._require_ip(ip))
+        self._formatted_cache.pop('whitelist', None)
+        
+        response = ResponseMessage(
+            status="success",
+            data={"message": f"Removed {ip} from whitelist"},
+            context={"command": "remove_from_whitelist"}
+        )
+        await self.send_message(message.header.source_agent_id, response)
+    
+    async def _cmd_get_threat_intel(self, message: Message, params: Dict[str, Any]):
+        """Return the current threat intelligence"""
+        response = ResponseMessage(
+            status="success",
+            data={
+                "known_threats": self._formatted('known_threats'),
+                "threat_count": len(self.known_threats),
+                "last_updated": (self.threat_intel_last_updated.isoformat()
+                                 if self.threat_intel_last_updated else None)
+            },
+            context={"command": "get_threat_intel"}
+        )
+        await self.send_message(message.header.source_agent_id, response)
+    
+    async def _cmd_update_threat_intel(self, message: Message, params: Dict[str, Any]):
+        """Force a threat intelligence update by restarting the refresh cycle"""
+        if self.update_task is not None and not self.update_task.done():
+            self.update_task.cancel()
+        self.update_task = asyncio.create_task(self._threat_intel_loop())
+        
+        response = ResponseMessage(
+            status="success",
+            data={"message": "Updating threat intelligence..."},
+            context={"command": "update_threat_intel"}
+        )
+        await self.send_message(message.header.source_agent_id, response)
+    
+    def _formatted(self, name: str) -> List[str]:
+        """Return an IP collection as text, reusing the list until the collection changes
+        
+        Code that mutates ``blacklist``, ``whitelist`` or ``known_threats`` drops the
+        matching entry from ``_formatted_cache``.
+        """
+        formatted = self._formatted_cache.get(name)
+        if formatted is None:
+            if name == 'blacklist':
+                formatted = [_format_network(*entry) for entry in self.blacklist]
+            else:
+                formatted = [_format_ip(ip) for ip in getattr(self, name)]
+            self._formatted_cache[name] = formatted
+        return formatted
+    
+    @staticmethod
+    def _require_ip(ip: str) -> int:
+        """Parse an IP address from command parameters"""
+        packed = _parse_ip(ip)
+        if packed is None:
+            raise ValueError(f"Invalid IP address: {ip}")
+        return packed
+    
+    @staticmethod
+    def _require_network(network: str) -> Tuple[int, int]:
+        """Parse an IP address or CIDR block from command parameters"""
+        parsed = _parse_network(network)
+        if parsed is None:
+            raise ValueError(f"Invalid IP address or network: {network}")
+        return parsed
+    
     async def _handle_status_update(self, message: Message):
         """Handle status update messages"""
         # Log status updates at info level
-        self.logger.info(
-            f"Status update from {message.header.source_agent_id}: {message.payload}",
-            extra={"payload": message.payload}
-        )
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info(
+                f"Status update from {message.header.source_agent_id}: {message.payload}",
+                extra={"payload": message.payload}
+            )
     
     async def get_status(self) -> Dict[str, Any]:
         """Get current security status"""
@@ -525,9 +917,19 @@ class SecurityAgent(BaseAgent):
             "whitelist_size": len(self.whitelist),
             "failed_login_attempts": len(self.failed_login_attempts),
             "last_heartbeat": self.last_heartbeat.isoformat() if hasattr(self, 'last_heartbeat') else None,
-            "threat_intel_last_updated": self.update_task.done() and self.update_task.result() or None
+            "threat_intel_last_updated": (self.threat_intel_last_updated.isoformat()
+                                          if self.threat_intel_last_updated else None)
         }
     
+    async def stop(self):
+        """Clean up before stopping"""
+        await super().stop()
+        if self.update_task is not None and not self.update_task.done():
+            self.update_task.cancel()
+        if self._http is not None:
+            await self._http.close()
+            self._http = None
+    
     def __str__(self):
         """String representation of the security agent"""
         return (f"SecurityAgent(id={self.id}, events={len(self.security_events)}, "
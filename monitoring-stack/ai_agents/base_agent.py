@@ -1,10 +1,20 @@
 import asyncio
+import atexit
+import inspect
+import itertools
 import logging
+import logging.handlers
+import queue
+import secrets
 import time
+from array import array
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Callable, Coroutine, Type, TypeVar, Union
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Any, Callable, Coroutine, Type, TypeVar, Union
 from uuid import UUID, uuid4
-import json
+
+import orjson
+from pydantic import BaseModel
 
 from .schemas.agents import AgentDefinition, AgentStatus, AgentMetrics, AgentCapabilities, AgentState
 from .schemas.messages import Message, MessageHeader, MessageType, MessagePriority, LogMessage, ErrorMessage, CommandMessage, ResponseMessage, BroadcastMessage
@@ -12,62 +22,162 @@ from .schemas.crews import CrewDefinition, CrewMember, CrewRole
 
 T = TypeVar('T', bound='BaseAgent')
 
+# Most messages a worker drains per wakeup for a batch-capable handler
+QUEUE_BATCH_MAX = 64
+
+# How stale the cached wall clock used for message timestamps may get
+CLOCK_RESOLUTION_SECONDS = 0.01
+
+def _dump_model(model: BaseModel) -> Dict[str, Any]:
+    """Model fields as a dict, via the fast path of whichever pydantic is installed"""
+    dump = getattr(model, 'model_dump', None)
+    return dump() if dump is not None else model.dict()
+
+# All agent loggers feed one queue; a single listener thread does the blocking writes
+_LOG_QUEUE: Optional[queue.SimpleQueue] = None
+_LOG_LISTENER: Optional[logging.handlers.QueueListener] = None
+
+def _shared_log_queue() -> queue.SimpleQueue:
+    """Return the agent log queue, starting its listener thread on first use"""
+    global _LOG_QUEUE, _LOG_LISTENER
+    if _LOG_QUEUE is None:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter(
+            '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+            datefmt='%Y-%m-%d %H:%M:%S'
+        ))
+        _LOG_QUEUE = queue.SimpleQueue()
+        _LOG_LISTENER = logging.handlers.QueueListener(_LOG_QUEUE, handler)
+        _LOG_LISTENER.start()
+        atexit.register(_LOG_LISTENER.stop)
+    return _LOG_QUEUE
+
+@lru_cache(maxsize=None)
+def _agent_logger(name: str) -> logging.Logger:
+    """Logger for an agent name, wired to the shared queue the first time it's asked for"""
+    logger = logging.getLogger(f"agent.{name.lower().replace(' ', '_')}")
+    
+    # Records are queued here and written by the shared listener thread,
+    # so logging never blocks the event loop on stderr
+    if not logger.handlers:
+        logger.addHandler(logging.handlers.QueueHandler(_shared_log_queue()))
+    return logger
+
+_MESSAGE_TYPE_CODES: Dict[str, int] = {t.value: i for i, t in enumerate(MessageType)}
+
+class MessageRing:
+    """Fixed-capacity message history stored column-wise
+    
+    Receive time, message type and priority live in compact typed arrays so
+    counting and filtering never touch the pydantic objects; the messages
+    themselves are kept in a parallel list for retrieval.
+    """
+    __slots__ = ('capacity', 'ts_ns', 'mtype', 'prio', 'messages', 'head', 'size')
+    
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.ts_ns = array('q', bytes(8 * capacity))
+        self.mtype = array('B', bytes(capacity))
+        self.prio = array('B', bytes(capacity))
+        self.messages: List[Optional[Message]] = [None] * capacity
+        self.head = 0  # next slot to write
+        self.size = 0
+    
+    def append(self, message: Message, ts_ns: Optional[int] = None):
+        """Record a message, evicting the oldest once full"""
+        i = self.head
+        header = message.header
+        self.ts_ns[i] = ts_ns if ts_ns is not None else time.time_ns()
+        self.mtype[i] = _MESSAGE_TYPE_CODES.get(header.message_type, 0)
+        self.prio[i] = int(header.priority)
+        self.messages[i] = message
+        self.head = (i + 1) % self.capacity
+        if self.size < self.capacity:
+            self.size += 1
+    
+    def extend(self, messages: Iterable[Message]):
+        now_ns = time.time_ns()
+        for message in messages:
+            self.append(message, now_ns)
+    
+    def _slots(self) -> Iterator[int]:
+        """Occupied slot indexes, oldest first"""
+        start = (self.head - self.size) % self.capacity
+        for offset in range(self.size):
+            yield (start + offset) % self.capacity
+    
+    def count(self, message_type: Optional[str] = None, since_ns: int = 0) -> int:
+        """Number of stored messages of a type (any if None) received at or after since_ns"""
+        code = _MESSAGE_TYPE_CODES.get(message_type) if message_type is not None else None
+        ts_ns, mtype = self.ts_ns, self.mtype
+        return sum(
+            1 for i in self._slots()
+            if ts_ns[i] >= since_ns and (code is None or mtype[i] == code)
+        )
+    
+    def __len__(self) -> int:
+        return self.size
+    
+    def __iter__(self) -> Iterator[Message]:
+        messages = self.messages
+        for i in self._slots():
+            yield messages[i]
+
 class BaseAgent:
     """Base class for all AI agents with core messaging and lifecycle management"""
     
+    # Message type -> handler method name. Subclasses add or override entries
+    # through _EXTRA_HANDLERS; the merged map is built once per class.
+    _MESSAGE_HANDLERS: Dict[str, str] = {
+        MessageType.COMMAND: '_handle_command',
+        MessageType.RESPONSE: '_handle_response',
+        MessageType.BROADCAST: '_handle_broadcast',
+        MessageType.LOG: '_handle_log',
+        MessageType.ERROR: '_handle_error',
+    }
+    _EXTRA_HANDLERS: Dict[str, str] = {}
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._MESSAGE_HANDLERS = {**cls._MESSAGE_HANDLERS, **cls.__dict__.get('_EXTRA_HANDLERS', {})}
+    
     def __init__(self, agent_definition: AgentDefinition):
         """Initialize the agent with its definition"""
         self.definition = agent_definition
         self.id = agent_definition.identity.agent_id
         self.name = agent_definition.identity.name
         self.logger = self._setup_logger()
-        self.message_handlers = self._register_message_handlers()
         self.running = False
         self.task_queue = asyncio.Queue()
-        self.active_tasks: Dict[UUID, asyncio.Task] = {}
-        self.message_history: List[Message] = []
+        self.main_task: Optional[asyncio.Task] = None
+        self.active_task_count = 0
+        self.message_history = MessageRing(self.definition.config.max_message_history or 10000)
         self.crew_memberships: Dict[UUID, CrewMember] = {}
         self.crew_roles: Dict[UUID, CrewRole] = {}
-        self.last_heartbeat = datetime.utcnow()
         
-        # Register default message handlers
-        self._register_default_handlers()
+        # Outbound message ids: high 64 bits of the agent id, a random per-instance
+        # nonce so a restarted agent never reissues old ids, and a local sequence
+        self._msg_id_prefix = ((self.id.int >> 64) << 64) | (secrets.randbits(32) << 32)
+        self._msg_seq = itertools.count(1)
+        self._now_dt = datetime.utcnow()
+        self._now_mono = time.monotonic()
+        self.last_heartbeat = self._now_dt
+        self._start_mono = time.monotonic()
+        
+        # Stable part of get_status(), rebuilt only after a mutation
+        self._status_cache: Optional[Dict[str, Any]] = None
+        self._status_dirty = True
     
     def _setup_logger(self) -> logging.Logger:
         """Set up the agent's logger"""
-        logger = logging.getLogger(f"agent.{self.name.lower().replace(' ', '_')}")
+        logger = _agent_logger(self.name)
         logger.setLevel(self.definition.config.log_level)
-        
-        # Create console handler
-        ch = logging.StreamHandler()
-        ch.setLevel(self.definition.config.log_level)
-        
-        # Create formatter and add it to the handlers
-        formatter = logging.Formatter(
-            f'%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
-        )
-        ch.setFormatter(formatter)
-        
-        # Add the handlers to the logger
-        if not logger.handlers:
-            logger.addHandler(ch)
-        
         return logger
     
-    def _register_default_handlers(self):
-        """Register default message handlers"""
-        self.message_handlers.update({
-            MessageType.COMMAND: self._handle_command,
-            MessageType.RESPONSE: self._handle_response,
-            MessageType.BROADCAST: self._handle_broadcast,
-            MessageType.LOG: self._handle_log,
-            MessageType.ERROR: self._handle_error,
-        })
-    
-    def _register_message_handlers(self) -> Dict[str, Callable[[Message], Coroutine[Any, Any, None]]]:
-        """Register message handlers - to be overridden by subclasses"""
-        return {}
+    def _get_handler(self, message_type: str) -> Optional[Callable[[Message], Coroutine[Any, Any, None]]]:
+        """Bound handler for a message type, or None if the agent doesn't handle it"""
+        name = self._MESSAGE_HANDLERS.get(message_type)
+        return getattr(self, name) if name else None
     
     async def start(self):
         """Start the agent's main loop"""
@@ -76,14 +186,13 @@ class BaseAgent:
             return
         
         self.running = True
+        self._start_mono = time.monotonic()
         self.definition.state.status = AgentStatus.IDLE
-        self.logger.info(f"Starting agent: {self.name} (ID: {self.id})")
+        self._status_dirty = True
+        self.logger.info("Starting agent: %s (ID: %s)", self.name, self.id)
         
-        # Start the main task
-        self.main_task = asyncio.create_task(self._run())
-        
-        # Start the heartbeat
-        self.heartbeat_task = asyncio.create_task(self._heartbeat())
+        # Workers, background loop and heartbeat all run under one task group
+        self.main_task = asyncio.create_task(self._supervise())
         
         # Announce startup
         await self.broadcast(
@@ -100,14 +209,13 @@ class BaseAgent:
         self.logger.info("Stopping agent...")
         self.running = False
         
-        # Cancel all tasks
-        for task_id, task in list(self.active_tasks.items()):
-            if not task.done():
-                task.cancel()
-        
-        # Wait for tasks to complete
-        if self.active_tasks:
-            await asyncio.wait(list(self.active_tasks.values()))
+        # Cancelling the supervisor cancels and awaits every task in its group.
+        # gather() collects the outcome so no exception goes unretrieved, and the
+        # shield lets teardown finish even if stop() itself is cancelled.
+        main_task, self.main_task = self.main_task, None
+        if main_task is not None and main_task is not asyncio.current_task():
+            main_task.cancel()
+            await asyncio.shield(asyncio.gather(main_task, return_exceptions=True))
         
         # Send shutdown notification
         await self.broadcast(
@@ -118,18 +226,24 @@ class BaseAgent:
         
         # Update status
         self.definition.state.status = AgentStatus.TERMINATED
+        self._status_dirty = True
         self.logger.info("Agent stopped")
     
+    async def _supervise(self):
+        """Own the agent's long-running tasks for the lifetime of the agent"""
+        self._worker_count = max(1, self.definition.resources.max_concurrent_tasks)
+        async with asyncio.TaskGroup() as tg:
+            for _ in range(self._worker_count):
+                tg.create_task(self._worker())
+            tg.create_task(self._run())
+            tg.create_task(self._heartbeat())
+    
     async def _run(self):
-        """Main agent loop"""
+        """Main agent loop - runs background work while the workers handle messages"""
         try:
             while self.running:
                 try:
-                    # Process messages from the queue
-                    message = await asyncio.wait_for(self.task_queue.get(), timeout=1.0)
-                    await self._process_message(message)
-                except asyncio.TimeoutError:
-                    # No messages, do background work
+                    await asyncio.sleep(1.0)
                     await self._do_background_work()
                 except Exception as e:
                     self.logger.error(f"Error in agent loop: {str(e)}", exc_info=True)
@@ -142,7 +256,74 @@ class BaseAgent:
             self.logger.info("Agent loop cancelled")
         except Exception as e:
             self.logger.critical(f"Critical error in agent loop: {str(e)}", exc_info=True)
-            await self.stop()
+            # stop() cancels this task's group, so run it outside the group
+            self._stop_task = asyncio.create_task(self.stop())
+    
+    async def _worker(self):
+        """Consume messages from the task queue until the agent stops"""
+        try:
+            while self.running:
+                batch = [await self.task_queue.get()]
+                message_type = batch[0].header.message_type
+                # Only batch-capable handlers gain from draining; anything else stays
+                # queued so idle workers can handle it concurrently. The drain takes
+                # at most this worker's share of the backlog and ends at the first
+                # message of another type.
+                if hasattr(self._get_handler(message_type), 'handle_batch'):
+                    limit = min(QUEUE_BATCH_MAX, 1 + self.task_queue.qsize() // self._worker_count)
+                    while len(batch) < limit and not self.task_queue.empty():
+                        message = self.task_queue.get_nowait()
+                        batch.append(message)
+                        if message.header.message_type != message_type:
+                            break
+                try:
+                    await self._process_batch(batch)
+                finally:
+                    for _ in batch:
+                        self.task_queue.task_done()
+        except asyncio.CancelledError:
+            pass
+    
+    async def _process_batch(self, batch: List[Message]):
+        """Dispatch a drained batch, grouped by message type
+        
+        Handlers exposing a ``handle_batch`` attribute get each group in one call;
+        everything else is processed message by message.
+        """
+        if len(batch) == 1:
+            await self._process_message(batch[0])
+            return
+        
+        groups: Dict[MessageType, List[Message]] = {}
+        for message in batch:
+            groups.setdefault(message.header.message_type, []).append(message)
+        
+        for message_type, messages in groups.items():
+            handle_batch = getattr(self._get_handler(message_type), 'handle_batch', None)
+            if handle_batch is None or len(messages) == 1:
+                for message in messages:
+                    await self._process_message(message)
+                continue
+            
+            self.message_history.extend(messages)
+            self.definition.state.metrics.total_tasks_processed += len(messages)
+            self._status_dirty = True
+            self.active_task_count += 1
+            try:
+                await handle_batch(messages)
+            except Exception as e:
+                self.logger.error(f"Error in batch message handler: {str(e)}", exc_info=True)
+                await self._handle_error(ErrorMessage(
+                    error_type=type(e).__name__,
+                    error_message=str(e),
+                    context={
+                        "component": "message_handler",
+                        "message_type": message_type,
+                        "batch_size": len(messages)
+                    }
+                ))
+            finally:
+                self.active_task_count -= 1
     
     async def _process_message(self, message: Message):
         """Process an incoming message"""
@@ -152,17 +333,19 @@ class BaseAgent:
             
             # Update metrics
             self.definition.state.metrics.total_tasks_processed += 1
+            self._status_dirty = True
             
             # Handle the message based on its type
-            handler = self.message_handlers.get(message.header.message_type)
+            handler = self._get_handler(message.header.message_type)
             if handler:
-                # Create a task to handle the message
-                task_id = uuid4()
-                task = asyncio.create_task(self._execute_handler(handler, message, task_id))
-                self.active_tasks[task_id] = task
-                task.add_done_callback(lambda t, tid=task_id: self.active_tasks.pop(tid, None))
+                # Handle the message inline on this worker
+                self.active_task_count += 1
+                try:
+                    await self._execute_handler(handler, message)
+                finally:
+                    self.active_task_count -= 1
             else:
-                self.logger.warning(f"No handler for message type: {message.header.message_type}")
+                self.logger.warning("No handler for message type: %s", message.header.message_type)
         except Exception as e:
             self.logger.error(f"Error processing message: {str(e)}", exc_info=True)
             await self._handle_error(ErrorMessage(
@@ -172,7 +355,7 @@ class BaseAgent:
             ))
     
     async def _execute_handler(self, handler: Callable[[Message], Coroutine[Any, Any, None]], 
-                             message: Message, task_id: UUID):
+                             message: Message):
         """Execute a message handler with error handling"""
         try:
             await handler(message)
@@ -184,31 +367,52 @@ class BaseAgent:
                 context={
                     "component": "message_handler",
                     "message_type": message.header.message_type,
-                    "task_id": str(task_id)
+                    "message_id": str(message.header.message_id)
                 }
             ))
     
     async def _heartbeat(self):
-        """Send periodic heartbeats"""
+        """Send periodic heartbeats on fixed deadlines so the cadence doesn't drift"""
         try:
+            interval = self.definition.config.heartbeat_interval_seconds
+            next_tick = time.monotonic()
             while self.running:
-                self.last_heartbeat = datetime.utcnow()
+                now = time.monotonic()
+                self.last_heartbeat = self._utcnow()
                 self.definition.state.metrics.last_heartbeat = self.last_heartbeat
                 
                 # Update uptime
-                uptime = (datetime.utcnow() - self.definition.identity.created_at).total_seconds()
-                self.definition.state.metrics.uptime_seconds = uptime
+                self.definition.state.metrics.uptime_seconds = now - self._start_mono
+                self._status_dirty = True
                 
                 # Log status
-                self.logger.debug(f"Heartbeat - Status: {self.definition.state.status}")
+                self.logger.debug("Heartbeat - Status: %s", self.definition.state.status)
                 
-                # Sleep until next heartbeat
-                await asyncio.sleep(self.definition.config.heartbeat_interval_seconds)
+                # Sleep until the next deadline; beats missed under load are skipped
+                next_tick += interval
+                if next_tick <= now:
+                    next_tick = now + interval
+                await asyncio.sleep(next_tick - time.monotonic())
         except asyncio.CancelledError:
             self.logger.info("Heartbeat task cancelled")
         except Exception as e:
             self.logger.error(f"Error in heartbeat: {str(e)}", exc_info=True)
     
+    def _utcnow(self) -> datetime:
+        """Current UTC time, re-read only once CLOCK_RESOLUTION_SECONDS have passed"""
+        now = time.monotonic()
+        if now - self._now_mono >= CLOCK_RESOLUTION_SECONDS:
+            self._now_mono = now
+            self._now_dt = datetime.utcnow()
+        return self._now_dt
+    
+    def _next_message_id(self) -> UUID:
+        """Unique outbound message id without drawing from the system CSPRNG
+        
+        Marked as a version 4 UUID, which sets the RFC 4122 variant and version bits.
+        """
+        return UUID(int=self._msg_id_prefix | (next(self._msg_seq) & 0xFFFFFFFF), version=4)
+    
     async def _do_background_work(self):
         """Perform background work - to be overridden by subclasses"""
         pass
@@ -216,14 +420,14 @@ class BaseAgent:
     # Message sending methods
     async def send_message(self, target_agent_id: UUID, message: Message):
         """Send a message to a specific agent"""
-        if not isinstance(target_agent_id, UUID):
-            target_agent_id = UUID(target_agent_id)
-            
+        # Callers pass ids taken from validated headers; checked only in debug runs
+        assert isinstance(target_agent_id, UUID), f"target_agent_id must be a UUID, got {type(target_agent_id).__name__}"
+        
         # Set message headers if not already set
         if not message.header.message_id:
-            message.header.message_id = uuid4()
+            message.header.message_id = self._next_message_id()
         if not message.header.timestamp:
-            message.header.timestamp = datetime.utcnow()
+            message.header.timestamp = self._utcnow()
         if not message.header.source_agent_id:
             message.header.source_agent_id = self.id
             
@@ -231,7 +435,7 @@ class BaseAgent:
         message.header.target_agent_ids = [target_agent_id]
         
         # Log the message
-        self.logger.debug(f"Sending message to agent {target_agent_id}: {message}")
+        self.logger.debug("Sending message to agent %s: %s", target_agent_id, message)
         
         # In a real implementation, this would send the message to a message broker
         # For now, we'll just log it
@@ -246,13 +450,13 @@ class BaseAgent:
                        target_roles: Optional[List[UUID]] = None,
                        **kwargs) -> UUID:
         """Broadcast a message to multiple agents"""
-        message_id = uuid4()
+        message_id = self._next_message_id()
         
         # Create the message
         message = Message(
             header=MessageHeader(
                 message_id=message_id,
-                timestamp=datetime.utcnow(),
+                timestamp=self._utcnow(),
                 message_type=message_type,
                 priority=priority,
                 source_agent_id=self.id,
@@ -268,7 +472,7 @@ class BaseAgent:
         )
         
         # Log the broadcast
-        self.logger.info(f"Broadcasting message: {message_id}")
+        self.logger.info("Broadcasting message: %s", message_id)
         
         # In a real implementation, this would publish to a message broker
         # For now, we'll just log it
@@ -279,15 +483,15 @@ class BaseAgent:
     # Message handler stubs - to be overridden by subclasses
     async def _handle_command(self, message: Message):
         """Handle command messages"""
-        self.logger.warning(f"No command handler implemented for message: {message}")
+        self.logger.warning("No command handler implemented for message: %s", message)
     
     async def _handle_response(self, message: Message):
         """Handle response messages"""
-        self.logger.debug(f"Received response: {message}")
+        self.logger.debug("Received response: %s", message)
     
     async def _handle_broadcast(self, message: Message):
         """Handle broadcast messages"""
-        self.logger.debug(f"Received broadcast: {message}")
+        self.logger.debug("Received broadcast: %s", message)
     
     async def _handle_log(self, message: Message):
         """Handle log messages"""
@@ -296,7 +500,7 @@ class BaseAgent:
         source = message.payload.get("source", "unknown")
         
         log_method = getattr(self.logger, log_level.lower(), self.logger.info)
-        log_method(f"[{source}] {log_message}")
+        log_method("[%s] %s", source, log_message)
     
     async def _handle_error(self, error: Union[ErrorMessage, Exception]):
         """Handle error messages and exceptions"""
@@ -315,6 +519,7 @@ class BaseAgent:
         
         # Update error count
         self.definition.state.metrics.error_count += 1
+        self._status_dirty = True
         
         # Notify monitoring if configured
         if self.definition.config.alert_on_errors:
@@ -331,14 +536,14 @@ class BaseAgent:
     async def join_crew(self, crew: CrewDefinition, role: CrewRole):
         """Join a crew with a specific role"""
         if crew.crew_id in self.crew_memberships:
-            self.logger.warning(f"Already a member of crew: {crew.crew_id}")
+            self.logger.warning("Already a member of crew: %s", crew.crew_id)
             return False
         
         # Create crew membership
         membership = CrewMember(
             agent_id=self.id,
             role_id=role.role_id,
-            join_date=datetime.utcnow(),
+            join_date=self._utcnow(),
             is_active=True
         )
         
@@ -346,42 +551,61 @@ class BaseAgent:
         crew.members[uuid4()] = membership
         self.crew_memberships[crew.crew_id] = membership
         self.crew_roles[role.role_id] = role
+        self._status_dirty = True
         
-        self.logger.info(f"Joined crew {crew.name} as {role.name}")
+        self.logger.info("Joined crew %s as %s", crew.name, role.name)
         return True
     
     async def leave_crew(self, crew_id: UUID):
         """Leave a crew"""
         if crew_id not in self.crew_memberships:
-            self.logger.warning(f"Not a member of crew: {crew_id}")
+            self.logger.warning("Not a member of crew: %s", crew_id)
             return False
         
         # Deactivate membership
         self.crew_memberships[crew_id].is_active = False
-        self.crew_memberships[crew_id].leave_date = datetime.utcnow()
+        self.crew_memberships[crew_id].leave_date = self._utcnow()
         
         # Remove role associations
         role_id = self.crew_memberships[crew_id].role_id
         if role_id in self.crew_roles:
             del self.crew_roles[role_id]
+        self._status_dirty = True
         
-        self.logger.info(f"Left crew: {crew_id}")
+        self.logger.info("Left crew: %s", crew_id)
         return True
     
     # Utility methods
     def get_status(self) -> Dict[str, Any]:
-        """Get current agent status"""
+        """Get current agent status
+        
+        The model dumps and crew lists are cached until something marks the
+        status dirty, so code that writes ``definition.state`` must set
+        ``_status_dirty``. Queue size, in-flight count and heartbeat are read
+        fresh, and callers get their own copies of the nested dicts.
+        """
+        if self._status_dirty or self._status_cache is None:
+            self._status_cache = {
+                "agent_id": str(self.id),
+                "name": self.name,
+                "status": self.definition.state.status,
+                "capabilities": _dump_model(self.definition.capabilities),
+                "metrics": _dump_model(self.definition.state.metrics),
+                "crew_memberships": [str(crew_id) for crew_id in self.crew_memberships],
+                "crew_roles": [str(role_id) for role_id in self.crew_roles]
+            }
+            self._status_dirty = False
+        
+        cache = self._status_cache
         return {
-            "agent_id": str(self.id),
-            "name": self.name,
-            "status": self.definition.state.status,
-            "capabilities": self.definition.capabilities.dict(),
-            "metrics": self.definition.state.metrics.dict(),
-            "active_tasks": len(self.active_tasks),
+            **cache,
+            "capabilities": dict(cache["capabilities"]),
+            "metrics": dict(cache["metrics"]),
+            "crew_memberships": list(cache["crew_memberships"]),
+            "crew_roles": list(cache["crew_roles"]),
+            "active_tasks": self.active_task_count,
             "message_queue_size": self.task_queue.qsize(),
             "last_heartbeat": self.last_heartbeat.isoformat() if self.last_heartbeat else None,
-            "crew_memberships": [str(crew_id) for crew_id in self.crew_memberships],
-            "crew_roles": [str(role_id) for role_id in self.crew_roles]
         }
     
     def to_dict(self) -> Dict[str, Any]:
@@ -391,15 +615,30 @@ class BaseAgent:
             "name": self.name,
             "type": self.definition.identity.agent_type,
             "status": self.definition.state.status,
-            "capabilities": self.definition.capabilities.dict(),
-            "config": self.definition.config.dict(),
-            "state": self.definition.state.dict(),
+            "capabilities": _dump_model(self.definition.capabilities),
+            "config": _dump_model(self.definition.config),
+            "state": _dump_model(self.definition.state),
             "crew_memberships": [
                 {"crew_id": str(crew_id), "role_id": str(member.role_id), "is_active": member.is_active}
                 for crew_id, member in self.crew_memberships.items()
             ]
         }
     
+    async def status_json(self) -> bytes:
+        """Serialize get_status() to JSON bytes
+        
+        Subclasses such as the monitoring and security agents override
+        get_status() as a coroutine, so the result is awaited when needed.
+        """
+        status = self.get_status()
+        if inspect.isawaitable(status):
+            status = await status
+        return orjson.dumps(status, default=str)
+    
+    def to_json(self) -> bytes:
+        """Serialize to_dict() to JSON bytes"""
+        return orjson.dumps(self.to_dict(), default=str)
+    
     def __str__(self) -> str:
         """String representation of the agent"""
         return f"{self.__class__.__name__}(id={self.id}, name='{self.name}', status={self.definition.state.status})"
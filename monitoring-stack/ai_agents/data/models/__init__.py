@@ -4,6 +4,12 @@ from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 
+import orjson
+
+def _orjson_dumps(v: Any, *, default: Any) -> str:
+    """Pydantic json_dumps hook; orjson encodes UUID and datetime natively."""
+    return orjson.dumps(v, default=default, option=orjson.OPT_UTC_Z).decode()
+
 class BaseModel(BaseModel):
     """Base model with common fields and methods."""
     id: UUID = Field(default_factory=uuid4)
@@ -11,10 +17,8 @@ class BaseModel(BaseModel):
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     
     class Config:
-        json_encoders = {
-            UUID: lambda v: str(v),
-            datetime: lambda v: v.isoformat()
-        }
+        json_dumps = _orjson_dumps
+        json_loads = orjson.loads
         orm_mode = True
 
 class AgentCapabilities(BaseModel):
@@ -40,11 +44,5 @@ class AgentMetrics(BaseModel):
     value: float
     timestamp: datetime = Field(default_factory=datetime.utcnow)
     tags: Optional[Dict[str, str]] = None
-    
-    class Config:
-        json_encoders = {
-            UUID: lambda v: str(v),
-            datetime: lambda v: v.isoformat()
-        }
 
 # Add any additional models or relationships here
@@ -1,17 +1,32 @@
 """Repository for AgentMetrics operations."""
+import asyncio
+from collections import deque
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple, Union
+from typing import Deque, Dict, List, Optional, Tuple, Union
 from uuid import UUID
 
 from ..models import AgentMetrics
 from .base_repository import BaseRepository
 
+# Buffered metrics are flushed once this many are pending, or every interval
+METRIC_FLUSH_BATCH = 256
+METRIC_FLUSH_INTERVAL_SECONDS = 1.0
+# Bound on metrics held while the database is unreachable; the oldest go first
+METRIC_BUFFER_MAX = 10_000
+# A batch that fails this many writes in a row is dropped instead of retried
+METRIC_FLUSH_MAX_ATTEMPTS = 3
+
 class AgentMetricsRepository(BaseRepository[AgentMetrics]):
     """Repository for AgentMetrics time-series operations."""
     
     def __init__(self):
         """Initialize the repository with the table name and model class."""
         super().__init__("agent_metrics", AgentMetrics)
+        self._buffer: Deque[AgentMetrics] = deque(maxlen=METRIC_BUFFER_MAX)
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_failures = 0
+        self.dropped_metrics = 0
     
     async def get_metrics_by_agent(
         self, 
@@ -22,6 +37,7 @@ class AgentMetricsRepository(BaseRepository[AgentMetrics]):
         limit: int = 1000
     ) -> List[AgentMetrics]:
         """Get metrics for a specific agent with optional filters."""
+        await self._flush_before_read()
         query = {"agent_id": str(agent_id)}
         
         if metric_name:
@@ -48,8 +64,77 @@ class AgentMetricsRepository(BaseRepository[AgentMetrics]):
         return [self.model_class(**item) for item in result.data]
     
     async def record_metric(self, metric: AgentMetrics) -> AgentMetrics:
-        """Record a new metric value."""
-        return await self.create(metric.dict())
+        """Record a new metric value.
+        
+        The metric is buffered and written in bulk with others, either once
+        METRIC_FLUSH_BATCH are pending or on the periodic flush. A failed write
+        is logged and left to the periodic flush to retry, since the metric is
+        already buffered and re-recording it would duplicate it.
+        """
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_loop())
+        
+        if len(self._buffer) == self._buffer.maxlen:
+            self.dropped_metrics += 1
+        self._buffer.append(metric)
+        if len(self._buffer) >= METRIC_FLUSH_BATCH:
+            try:
+                await self.flush()
+            except Exception as e:
+                self.logger.warning(f"Metric flush failed, will retry: {str(e)}")
+        return metric
+    
+    async def flush(self) -> int:
+        """Write all buffered metrics in bulk inserts; returns the number written."""
+        written = 0
+        async with self._flush_lock:
+            while self._buffer:
+                batch = [self._buffer.popleft()
+                         for _ in range(min(METRIC_FLUSH_BATCH, len(self._buffer)))]
+                try:
+                    await self.create_many([metric.dict() for metric in batch])
+                except Exception:
+                    self._flush_failures += 1
+                    if self._flush_failures >= METRIC_FLUSH_MAX_ATTEMPTS:
+                        self._flush_failures = 0
+                        self.dropped_metrics += len(batch)
+                        self.logger.error(
+                            f"Dropping {len(batch)} metrics after "
+                            f"{METRIC_FLUSH_MAX_ATTEMPTS} failed writes"
+                        )
+                    else:
+                        # Put them back in order so the next flush retries them
+                        self._buffer.extendleft(reversed(batch))
+                    raise
+                self._flush_failures = 0
+                written += len(batch)
+        return written
+    
+    async def _flush_before_read(self):
+        """Flush pending metrics for a read without failing the read on write errors."""
+        try:
+            await self.flush()
+        except Exception as e:
+            self.logger.warning(f"Metric flush before read failed: {str(e)}")
+    
+    async def _flush_loop(self):
+        """Flush buffered metrics periodically"""
+        while True:
+            await asyncio.sleep(METRIC_FLUSH_INTERVAL_SECONDS)
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.warning(f"Metric flush failed, will retry: {str(e)}")
+    
+    async def close(self):
+        """Stop the periodic flush and write out anything still buffered."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            await asyncio.wait([self._flush_task])
+            self._flush_task = None
+        await self.flush()
     
     async def get_metric_stats(
         self,
@@ -58,39 +143,18 @@ class AgentMetricsRepository(BaseRepository[AgentMetrics]):
         group_interval: timedelta = timedelta(minutes=5)
     ) -> List[Dict[str, Union[datetime, float]]]:
         """Get aggregated statistics for a metric over time."""
+        await self._flush_before_read()
         end_time = datetime.utcnow()
         start_time = end_time - time_window
         
-        # This is a simplified example - in a real app, you'd use Supabase's RPC
-        # for time-series aggregation
-        query = f"""
-        SELECT 
-            time_bucket_gapfill(
-                '{interval} seconds', 
-                timestamp, 
-                start => '{start_time.isoformat()}', 
-                finish => '{end_time.isoformat()}'
-            ) as bucket,
-            avg(value) as avg_value,
-            min(value) as min_value,
-            max(value) as max_value,
-            count(*) as sample_count
-        FROM {self.table_name}
-        WHERE 
-            name = '{metric_name}'
-            AND timestamp >= '{start_time.isoformat()}'
-            AND timestamp <= '{end_time.isoformat()}'
-        GROUP BY bucket
-        ORDER BY bucket
-        """.format(
-            interval=group_interval.total_seconds(),
-            start_time=start_time.isoformat(),
-            end_time=end_time.isoformat(),
-            table_name=self.table_name,
-            metric_name=metric_name
-        )
-        
-        result = await self._execute_rpc(query)
+        # Aggregation runs server-side in the agent_metric_stats function, so the
+        # statement is planned once and every value travels as a parameter
+        result = await self._execute_rpc("agent_metric_stats", {
+            "p_name": metric_name,
+            "p_start": start_time.isoformat(),
+            "p_end": end_time.isoformat(),
+            "p_interval": f"{int(group_interval.total_seconds())} seconds",
+        })
         return result.data if result else []
     
     async def get_latest_metric(
@@ -99,6 +163,7 @@ class AgentMetricsRepository(BaseRepository[AgentMetrics]):
         metric_name: str
     ) -> Optional[AgentMetrics]:
         """Get the most recent value for a specific metric."""
+        await self._flush_before_read()
         result = await self._execute_query(
             get_supabase_client()
             .table(self.table_name)
@@ -31,16 +31,10 @@ class AgentResourcesRepository(BaseRepository[AgentResources]):
         Returns:
             Dict mapping resource type to (used, total) tuple
         """
-        resources = await self.get_all()
-        utilization = {}
-        
-        for resource in resources:
-            if resource.type not in utilization:
-                utilization[resource.type] = [0.0, 0.0]
-                
-            if resource.is_available:
-                utilization[resource.type][1] += resource.capacity
-            else:
-                utilization[resource.type][0] += resource.capacity
-        
-        return {k: tuple(v) for k, v in utilization.items()}
+        # Summed per type in Postgres (agent_resource_totals), so only one row
+        # per resource type comes back over the wire
+        result = await self._execute_rpc("agent_resource_totals")
+        return {
+            row["resource_type"]: (float(row["used"]), float(row["total"]))
+            for row in (result.data or [])
+        }
@@ -1,5 +1,6 @@
 """Base repository class for Supabase operations."""
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar
+from functools import lru_cache
+from typing import Any, Dict, Generic, List, Optional, Tuple, Type, TypeVar
 from uuid import UUID
 import logging
 
@@ -8,6 +9,18 @@ from .config import get_supabase_client
 
 T = TypeVar('T', bound=BaseModel)
 
+@lru_cache(maxsize=256)
+def _compile_filters(shape: Tuple[Tuple[str, type], ...]) -> Tuple[Tuple[str, str], ...]:
+    """Resolve a filter shape (column, value type) to (column, builder method) pairs.
+    
+    Repositories query with the same few shapes over and over, so the type
+    checks happen once per shape instead of once per filter per call.
+    """
+    return tuple(
+        (key, "in_" if issubclass(value_type, (list, tuple)) else "eq")
+        for key, value_type in shape
+    )
+
 class BaseRepository(Generic[T]):
     """Base repository for Supabase CRUD operations."""
     
@@ -32,6 +45,12 @@ class BaseRepository(Generic[T]):
             self.logger.error(f"Error executing query: {str(e)}", exc_info=True)
             raise
     
+    async def _execute_rpc(self, function_name: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """Call a Postgres function through Supabase RPC with error handling."""
+        return await self._execute_query(
+            get_supabase_client().rpc, function_name, params or {}
+        )
+    
     async def get_by_id(self, id: UUID) -> Optional[T]:
         """Get a single record by ID."""
         result = await self._execute_query(
@@ -60,6 +79,15 @@ class BaseRepository(Generic[T]):
             raise ValueError("Failed to create record")
         return self.model_class(**result.data[0])
     
+    async def create_many(self, items: List[Dict[str, Any]]) -> List[T]:
+        """Create several records in a single insert."""
+        if not items:
+            return []
+        result = await self._execute_query(
+            get_supabase_client().table(self.table_name).insert(items)
+        )
+        return [self.model_class(**item) for item in result.data]
+    
     async def update(self, id: UUID, data: Dict[str, Any]) -> Optional[T]:
         """Update an existing record."""
         result = await self._execute_query(
@@ -87,11 +115,9 @@ class BaseRepository(Generic[T]):
         query = get_supabase_client().table(self.table_name).select("*")
         
         # Apply filters
-        for key, value in filters.items():
-            if isinstance(value, (list, tuple)):
-                query = query.in_(key, value)
-            else:
-                query = query.eq(key, value)
+        plan = _compile_filters(tuple((key, type(value)) for key, value in filters.items()))
+        for (key, method), value in zip(plan, filters.values()):
+            query = getattr(query, method)(key, value)
         
         result = await self._execute_query(query)
         return [self.model_class(**item) for item in result.data]
@@ -1,11 +1,16 @@
 """Supabase client configuration and initialization."""
 import os
-from typing import Optional
+import threading
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
 from dotenv import load_dotenv
 from supabase import create_client, Client as SupabaseClient
 
-# Load environment variables from .env file if it exists
-load_dotenv()
+@lru_cache(maxsize=None)
+def _load_env() -> None:
+    """Load a .env file once, and only if the environment doesn't already configure Supabase."""
+    if "SUPABASE_URL" not in os.environ or "SUPABASE_KEY" not in os.environ:
+        load_dotenv(override=False)
 
 class SupabaseConfig:
     """Configuration for Supabase client."""
@@ -23,8 +28,11 @@ class SupabaseConfig:
             key: Supabase service role or anon key. If not provided, will try to get from environment.
             schema: Database schema to use (default: public)
         """
-        self.url = url or os.getenv("SUPABASE_URL")
-        self.key = key or os.getenv("SUPABASE_KEY")
+        if not url or not key:
+            _load_env()
+        env = os.environ
+        self.url = url or env.get("SUPABASE_URL")
+        self.key = key or env.get("SUPABASE_KEY")
         self.schema = schema
         
         if not self.url or not self.key:
@@ -33,8 +41,19 @@ class SupabaseConfig:
                 "arguments or environment variables (SUPABASE_URL, SUPABASE_KEY)"
             )
 
+    def cache_key(self) -> Tuple[str, str, str]:
+        """Identity of the client this configuration produces."""
+        return (self.url, self.key, self.schema)
+
+# One client (and its pooled HTTP session) per distinct configuration
+_clients: Dict[Tuple[str, str, str], SupabaseClient] = {}
+_clients_lock = threading.Lock()
+
 def get_supabase_client(config: Optional[SupabaseConfig] = None) -> SupabaseClient:
-    """Create and return a Supabase client instance.
+    """Return the shared Supabase client for a configuration.
+    
+    Clients are created once per (url, key, schema) and reused, so callers
+    share connections instead of paying connection setup on every query.
     
     Args:
         config: Optional configuration. If not provided, will create from environment.
@@ -45,4 +64,16 @@ def get_supabase_client(config: Optional[SupabaseConfig] = None) -> SupabaseClie
     if config is None:
         config = SupabaseConfig()
     
-    return create_client(config.url, config.key)
+    key = config.cache_key()
+    client = _clients.get(key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                client = _clients[key] = create_client(config.url, config.key)
+    return client
+
+def clear_supabase_clients() -> None:
+    """Drop all cached clients, e.g. between tests or after rotating keys."""
+    with _clients_lock:
+        _clients.clear()
@@ -1,9 +1,16 @@
+import bisect
 from datetime import datetime
 from enum import Enum
-from typing import List, Dict, Any, Optional, Union
+from types import MappingProxyType
+from typing import List, Dict, Any, Mapping, NamedTuple, Optional, Union
 from pydantic import BaseModel, Field, validator, root_validator
 from uuid import UUID, uuid4
 
+try:
+    from pydantic import field_serializer
+except ImportError:  # pydantic 1.x has no field-level serializers
+    field_serializer = None
+
 # Enums for consistent values
 class MetricType(str, Enum):
     CPU = "cpu"
@@ -37,6 +44,8 @@ class BaseDataModel(BaseModel):
             datetime: lambda v: v.isoformat(),
             UUID: lambda v: str(v)
         }
+        # Store nested model instances as given rather than copying them
+        copy_on_model_validation = 'none'
     
     @root_validator(pre=True)
     def set_updated_at(cls, values):
@@ -45,16 +54,28 @@ class BaseDataModel(BaseModel):
         return values
 
 # Metric Models
-class MetricValue(BaseModel):
-    """Represents a single metric value with timestamp"""
+_NO_TAGS: Mapping[str, str] = MappingProxyType({})
+
+class MetricValue(NamedTuple):
+    """Represents a single metric value with timestamp
+    
+    A plain tuple rather than a pydantic model: samples are by far the most
+    numerous objects, so they skip the per-instance __dict__ and validation.
+    Input is validated where it enters a Metric.
+    """
     timestamp: datetime
     value: float
-    tags: Dict[str, str] = Field(default_factory=dict)
+    tags: Mapping[str, str] = _NO_TAGS
     
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the sample in its ``{timestamp, value, tags}`` wire format"""
+        return {'timestamp': self.timestamp, 'value': self.value, 'tags': dict(self.tags)}
+
+# Keyword arguments of pydantic 1.x BaseModel.dict(); the rest of json()'s go to json_dumps
+_DICT_KWARGS = frozenset((
+    'include', 'exclude', 'by_alias', 'skip_defaults',
+    'exclude_unset', 'exclude_defaults', 'exclude_none'
+))
 
 class Metric(BaseDataModel):
     """Represents a metric with a series of values"""
@@ -64,22 +85,45 @@ class Metric(BaseDataModel):
     unit: Optional[str] = None
     values: List[MetricValue] = Field(default_factory=list)
     
+    @validator('values', pre=True)
+    def coerce_values(cls, values):
+        """Accept samples as dicts (e.g. deserialized JSON) as well as MetricValues"""
+        return [MetricValue(**v) if isinstance(v, dict) else v for v in values or []]
+    
+    # Samples are stored as tuples but serialized as {timestamp, value, tags} objects
+    if field_serializer is not None:
+        @field_serializer('values')
+        def serialize_values(self, values: List[MetricValue]) -> List[Dict[str, Any]]:
+            return [value.to_dict() for value in values]
+    else:
+        # pydantic 1.x keeps named tuples as tuples, so convert after the
+        # standard dump (which has already applied include/exclude)
+        def dict(self, **kwargs) -> Dict[str, Any]:
+            data = super().dict(**kwargs)
+            if 'values' in data:
+                data['values'] = [MetricValue(*value).to_dict() for value in data['values']]
+            return data
+        
+        def json(self, *, encoder=None, models_as_dict: bool = True, **kwargs) -> str:
+            dict_kwargs = {k: kwargs.pop(k) for k in _DICT_KWARGS & kwargs.keys()}
+            return self.__config__.json_dumps(
+                self.dict(**dict_kwargs), default=encoder or self.__json_encoder__, **kwargs
+            )
+    
     def add_value(self, value: float, timestamp: datetime = None, tags: Dict[str, str] = None):
         """Add a new value to the metric"""
         if timestamp is None:
             timestamp = datetime.utcnow()
-        if tags is None:
-            tags = {}
-            
-        self.values.append(MetricValue(
-            timestamp=timestamp,
-            value=value,
-            tags=tags
-        ))
-        self.updated_at = datetime.utcnow()
         
-        # Keep values sorted by timestamp
-        self.values.sort(key=lambda x: x.timestamp)
+        new_value = MetricValue(timestamp, value, tags if tags is not None else _NO_TAGS)
+        
+        # Keep values sorted by timestamp; samples almost always arrive in order,
+        # so only out-of-order ones need a binary-search insert
+        if not self.values or timestamp >= self.values[-1].timestamp:
+            self.values.append(new_value)
+        else:
+            bisect.insort(self.values, new_value, key=lambda x: x.timestamp)
+        self.updated_at = datetime.utcnow()
         
         return self
 
@@ -141,6 +185,9 @@ class QueryFilter(BaseModel):
     field: str
     operator: str  # =, !=, >, <, >=, <=, in, not_in, contains, etc.
     value: Any
+    
+    class Config:
+        copy_on_model_validation = 'none'
 
 class QueryOptions(BaseModel):
     """Options for querying data"""
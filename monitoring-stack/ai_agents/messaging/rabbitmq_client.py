@@ -1,12 +1,43 @@
 import asyncio
 import aio_pika
-import json
 import logging
-from typing import Dict, Any, Optional, Callable, Awaitable, List
+from typing import Dict, Any, Optional, Callable, Awaitable, List, Tuple
 from uuid import UUID, uuid4
 
+import orjson
+from pydantic import ValidationError
+
+try:
+    from pydantic import TypeAdapter
+except ImportError:  # pydantic 1.x builds validators at class creation
+    TypeAdapter = None
+
 from ..schemas.messages import Message, MessageHeader, MessageType, MessagePriority
 
+# Most queued publishes sent together in one batch
+PUBLISH_BATCH_MAX = 256
+
+def _encode_message(message: Message) -> bytes:
+    """Message as JSON bytes; orjson handles the UUID, datetime and enum fields natively"""
+    dump = getattr(message, 'model_dump', None)
+    data = dump() if dump is not None else message.dict()
+    return orjson.dumps(data, default=str)
+
+# Static message properties, by the publish() persistent flag
+_PROPERTY_TEMPLATES: Dict[bool, Dict[str, Any]] = {
+    True: {'content_type': "application/json", 'delivery_mode': 2},   # persisted to disk
+    False: {'content_type': "application/json", 'delivery_mode': 1},  # transient
+}
+
+# Built at import so the first delivery in a burst doesn't pay for the schema
+_MESSAGE_ADAPTER = TypeAdapter(Message) if TypeAdapter is not None else None
+
+def _decode_message(body: bytes) -> Message:
+    """Parse and validate a delivery body in one step, without an intermediate str"""
+    if _MESSAGE_ADAPTER is not None:
+        return _MESSAGE_ADAPTER.validate_json(body)
+    return Message.parse_obj(orjson.loads(body))
+
 class RabbitMQClient:
     """Asynchronous RabbitMQ client for message queue communication"""
     
@@ -41,7 +72,10 @@ class RabbitMQClient:
         self._message_handler = None
         self._reconnect_task = None
         self._connection_lock = asyncio.Lock()
+        self._connected = False  # set once connect() succeeds, cleared on close
         self._consumers = {}
+        self._publish_queue: asyncio.Queue = asyncio.Queue()
+        self._publisher_task: Optional[asyncio.Task] = None
         self.logger = logging.getLogger(__name__)
     
     async def connect(self) -> bool:
@@ -50,11 +84,13 @@ class RabbitMQClient:
         Returns:
             bool: True if connection was successful, False otherwise
         """
-        if self.connection and not self.connection.is_closed:
+        # Steady state: a plain flag check, no lock
+        if self._connected:
             return True
             
+        # Slow path: only one task connects, the rest wait and re-check
         async with self._connection_lock:
-            if self.connection and not self.connection.is_closed:
+            if self._connected:
                 return True
                 
             retries = 0
@@ -95,6 +131,7 @@ class RabbitMQClient:
                         }
                     )
                     
+                    self._connected = True
                     self.logger.info(f"Connected to RabbitMQ and set up exchange '{self.exchange_name}' and queue '{self.queue_name}'")
                     return True
                     
@@ -111,6 +148,7 @@ class RabbitMQClient:
     
     def _on_connection_closed(self, connection, exception=None):
         """Called when the connection to RabbitMQ is closed unexpectedly"""
+        self._connected = False
         self.logger.warning(f"RabbitMQ connection closed: {str(exception) if exception else 'No error provided'}")
         self._schedule_reconnect()
     
@@ -152,49 +190,91 @@ class RabbitMQClient:
         Returns:
             bool: True if the message was published successfully, False otherwise
         """
-        if not self.connection or self.connection.is_closed:
+        if not self._connected:
             if not await self.connect():
                 self.logger.error("Cannot publish message: Not connected to RabbitMQ")
                 return False
         
         try:
+            header = message.header
+            # use_enum_values on the schemas already stores plain values; the
+            # getattr only matters for headers built without validation
+            message_type = getattr(header.message_type, 'value', header.message_type)
+            header_priority = int(header.priority)
+            
             # Use message type as routing key if not specified
             if routing_key is None:
-                routing_key = message.header.message_type.value
+                routing_key = message_type
             
             # Convert message to JSON
-            message_data = message.model_dump_json()
+            body = _encode_message(message)
             
             # Create message properties
             properties = aio_pika.MessageProperties(
-                content_type="application/json",
-                delivery_mode=2 if persistent else 1,  # 2 = persistent, 1 = transient
-                priority=priority or message.header.priority.value if isinstance(message.header.priority, MessagePriority) else 0,
-                message_id=str(message.header.message_id),
-                correlation_id=str(message.header.correlation_id) if message.header.correlation_id else None,
-                timestamp=message.header.timestamp,
+                **_PROPERTY_TEMPLATES[bool(persistent)],
+                priority=priority if priority is not None else header_priority,
+                message_id=str(header.message_id),
+                correlation_id=str(header.correlation_id) if header.correlation_id else None,
+                timestamp=header.timestamp,
                 headers={
-                    'agent_id': str(message.header.source_agent_id),
-                    'message_type': message.header.message_type.value,
-                    'priority': message.header.priority.value if isinstance(message.header.priority, MessagePriority) else 0
+                    'agent_id': str(header.source_agent_id),
+                    'message_type': message_type,
+                    'priority': header_priority
                 }
             )
             
-            # Publish the message
-            await self.exchange.publish(
-                aio_pika.Message(
-                    body=message_data.encode(),
-                    properties=properties
-                ),
-                routing_key=routing_key
+            amqp_message = aio_pika.Message(
+                body=body,
+                properties=properties
             )
-            
-            self.logger.debug(f"Published message to {routing_key}: {message.header.message_type}")
-            return True
-            
         except Exception as e:
             self.logger.error(f"Failed to publish message: {str(e)}", exc_info=True)
             return False
+        
+        # Hand off to the publisher task, which sends everything queued in the
+        # same loop tick as one batch
+        done = asyncio.get_running_loop().create_future()
+        self._publish_queue.put_nowait((amqp_message, routing_key, done))
+        if self._publisher_task is None or self._publisher_task.done():
+            self._publisher_task = asyncio.create_task(self._publish_loop())
+        return await done
+    
+    async def _publish_loop(self):
+        """Drain queued publishes and send each batch back to back on the channel"""
+        while True:
+            batch: List[Tuple[aio_pika.Message, str, asyncio.Future]] = [await self._publish_queue.get()]
+            try:
+                while len(batch) < PUBLISH_BATCH_MAX:
+                    batch.append(self._publish_queue.get_nowait())
+            except asyncio.QueueEmpty:
+                pass
+            
+            try:
+                exchange = self.exchange
+                if exchange is None:
+                    results = [ConnectionError("Not connected to RabbitMQ")] * len(batch)
+                else:
+                    results = await asyncio.gather(
+                        *(exchange.publish(amqp_message, routing_key=routing_key)
+                          for amqp_message, routing_key, _ in batch),
+                        return_exceptions=True
+                    )
+                
+                for (_, routing_key, done), result in zip(batch, results):
+                    if done.done():
+                        continue
+                    if isinstance(result, BaseException):
+                        self.logger.error(f"Failed to publish message to {routing_key}: {str(result)}")
+                        done.set_result(False)
+                    else:
+                        self.logger.debug(f"Published message to {routing_key}")
+                        done.set_result(True)
+            finally:
+                # A batch interrupted by close() was already taken off the queue,
+                # so its callers must be released here
+                for _, _, done in batch:
+                    if not done.done():
+                        done.set_result(False)
     
     async def consume(
         self,
@@ -214,7 +294,7 @@ class RabbitMQClient:
         Returns:
             bool: True if the consumer was started successfully, False otherwise
         """
-        if not self.connection or self.connection.is_closed:
+        if not self._connected:
             if not await self.connect():
                 self.logger.error("Cannot start consumer: Not connected to RabbitMQ")
                 return False
@@ -257,12 +337,9 @@ class RabbitMQClient:
         """Handle an incoming message"""
         try:
             # Parse the message
-            body = message.body.decode()
-            
             try:
-                message_data = json.loads(body)
-                msg = Message(**message_data)
-            except Exception as e:
+                msg = _decode_message(message.body)
+            except (ValidationError, ValueError) as e:
                 self.logger.error(f"Failed to parse message: {str(e)}")
                 if not auto_ack:
                     await message.nack(requeue=False)
@@ -300,6 +377,17 @@ class RabbitMQClient:
     async def close(self):
         """Close the connection to RabbitMQ"""
         try:
+            if self._publisher_task and not self._publisher_task.done():
+                self._publisher_task.cancel()
+                await asyncio.gather(self._publisher_task, return_exceptions=True)
+            self._publisher_task = None
+            
+            # Anything still queued will never be sent
+            while not self._publish_queue.empty():
+                _, _, done = self._publish_queue.get_nowait()
+                if not done.done():
+                    done.set_result(False)
+            
             if self._reconnect_task and not self._reconnect_task.done():
                 self._reconnect_task.cancel()
                 try:
@@ -314,6 +402,7 @@ class RabbitMQClient:
         except Exception as e:
             self.logger.error(f"Error closing RabbitMQ connection: {str(e)}", exc_info=True)
         finally:
+            self._connected = False
             self.connection = None
             self.channel = None
             self.exchange = None
@@ -55,6 +55,10 @@ class AgentConfig(BaseModelWithConfig):
     backup_interval_hours: int = 24
     alert_on_errors: bool = True
     alert_on_warnings: bool = False
+    log_buffer_max_entries: int = 1000  # Flush when this many logs are buffered
+    log_buffer_max_bytes: int = 8 * 1024 * 1024  # Flush when buffered logs reach this size
+    log_flush_interval_seconds: int = 60  # Flush at least this often
+    max_message_history: int = 10000  # Oldest messages are evicted past this
 
 class AgentDependencies(BaseModelWithConfig):
     """External services and resources this agent depends on"""
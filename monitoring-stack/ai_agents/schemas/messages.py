@@ -16,11 +16,18 @@ class MessageHeader(BaseModelWithConfig):
     parent_message_id: Optional[UUID] = None
     requires_ack: bool = True
     ttl_seconds: Optional[int] = 3600  # Time to live in seconds
+    
+    class Config:
+        # Reuse the instance when nested into a Message instead of copying it
+        copy_on_model_validation = 'none'
 
 class MessagePayload(BaseModelWithConfig):
     content: Dict[str, Any] = Field(default_factory=dict)
     metadata: Dict[str, Any] = Field(default_factory=dict)
     attachments: List[Dict[str, Any]] = Field(default_factory=list)
+    
+    class Config:
+        copy_on_model_validation = 'none'
 
 class Message(BaseModelWithConfig):
     header: MessageHeader
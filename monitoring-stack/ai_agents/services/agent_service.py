@@ -19,6 +19,16 @@ class AgentService:
         self.resources_repo = AgentResourcesRepository()
         self.metrics_repo = AgentMetricsRepository()
     
+    async def close(self):
+        """Flush buffered metrics and stop background repository work."""
+        await self.metrics_repo.close()
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+    
     # Agent Capabilities Methods
     
     async def get_capability(self, capability_id: UUID) -> Optional[AgentCapabilities]:
@@ -137,7 +137,7 @@ class BaseStorageBackend(ABC):
                 values.append({
                     'timestamp': value.timestamp,
                     'value': value.value,
-                    'tags': value.tags
+                    'tags': dict(value.tags)
                 })
         
         # Sort by timestamp
@@ -370,7 +370,7 @@ class StorageManager:
                         result.append({
                             'timestamp': value.timestamp,
                             'value': value.value,
-                            'tags': value.tags
+                            'tags': dict(value.tags)
                         })
                 
                 return result
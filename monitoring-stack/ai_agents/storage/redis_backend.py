@@ -104,7 +104,7 @@ class RedisBackend(BaseStorageBackend):
                     {
                         'timestamp': v.timestamp.isoformat(),
                         'value': v.value,
-                        'tags': v.tags
+                        'tags': dict(v.tags)
                     }
                     for v in metric.values
                 ],
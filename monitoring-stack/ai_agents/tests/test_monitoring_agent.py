@@ -1,10 +1,13 @@
 import asyncio
+import base64
+import orjson
+import time
 import pytest
 import psutil
 from datetime import datetime, timedelta
 from unittest.mock import AsyncMock, MagicMock, patch
 
-from ..agents.monitoring_agent import MonitoringAgent
+from ..agents.monitoring_agent import MonitoringAgent, gorilla_encode, gorilla_decode
 from ..schemas.agents import AgentDefinition, AgentStatus, AgentCapabilities, AgentType, AgentState, AgentMetrics, AgentIdentity, AgentConfig, AgentDependencies
 from ..schemas.messages import Message, MessageHeader, MessageType, MessagePriority, AlertMessage, CommandMessage, ResponseMessage, BroadcastMessage, MetricMessage
 
@@ -77,6 +80,9 @@ async def test_monitoring_agent_initialization(monitoring_agent):
 @pytest.mark.asyncio
 async def test_collect_system_metrics(monitoring_agent):
     """Test collection of system metrics"""
+    # Use the psutil path so the mocks below are exercised
+    monitoring_agent._procfs = None
+    
     # Mock psutil functions
     with patch('psutil.cpu_percent', return_value=25.5), \
          patch('psutil.cpu_times_percent', return_value=type('obj', (object,), {
@@ -121,7 +127,7 @@ async def test_collect_system_metrics(monitoring_agent):
         # Check that metrics were stored
         assert len(monitoring_agent.metrics_history['cpu']) == 1
         assert len(monitoring_agent.metrics_history['memory']) == 1
-        assert len(monitoring_agent.metrics_history['disk']) == 1
+        assert len(monitoring_agent._disk_history['/']) == 1
         assert len(monitoring_agent.metrics_history['network']) == 1
         
         # Check CPU metrics
@@ -135,7 +141,7 @@ async def test_collect_system_metrics(monitoring_agent):
         assert memory_metrics['percent'] == 40.0
         
         # Check disk metrics
-        disk_metrics = monitoring_agent.metrics_history['disk'][0]
+        disk_metrics = monitoring_agent._disk_history['/'][0]
         assert disk_metrics['mountpoint'] == '/'
         assert disk_metrics['percent'] == 50.0
         
@@ -170,8 +176,9 @@ async def test_handle_metric_message(monitoring_agent):
         payload=test_metric
     )
     
-    # Process the message
+    # Process the message and deliver any queued alerts
     await monitoring_agent._handle_metric_message(message)
+    await monitoring_agent._flush_alert_queue()
     
     # Check that the metric was stored
     assert 'custom_metric' in monitoring_agent.metrics_history
@@ -229,6 +236,44 @@ async def test_handle_get_metrics_command(monitoring_agent):
     assert len(response.data['metrics']['cpu']) == 1  # Limited to 1 by the test
     assert response.data['metrics']['cpu'][0]['value'] == 30.0  # Most recent value
 
+def test_gorilla_round_trip():
+    """Test that Gorilla-encoded columns decode to the original values"""
+    values = [42.0, 42.0, 42.5, 41.75, 0.0, -3.25, 1e-300, 99.9]
+    encoded = gorilla_encode(values)
+    
+    assert gorilla_decode(encoded, len(values)) == values
+    assert len(encoded) < len(values) * 8
+
+@pytest.mark.asyncio
+async def test_get_metrics_rollup_and_compressed(monitoring_agent):
+    """Test that get_metrics serves downsampled tiers and compressed series"""
+    for value in (10.0, 20.0, 30.0):
+        monitoring_agent._store_metrics('requests', {'timestamp': datetime.utcnow(), 'value': value})
+    
+    message = MagicMock()
+    await monitoring_agent._cmd_get_metrics(message, {'type': 'requests', 'resolution': '1h'})
+    response = monitoring_agent.send_message.call_args[0][1]
+    [bucket] = response.data['metrics']
+    assert bucket['count'] == 3
+    assert bucket['avg'] == 20.0
+    assert (bucket['min'], bucket['max']) == (10.0, 30.0)
+    
+    await monitoring_agent._cmd_get_metrics(message, {'type': 'requests', 'compressed': True})
+    series = monitoring_agent.send_message.call_args[0][1].data['metrics']
+    assert series['count'] == 3
+    assert gorilla_decode(base64.b64decode(series['columns']['value']), 3) == [10.0, 20.0, 30.0]
+
+@pytest.mark.asyncio
+async def test_get_metrics_rejects_unknown_keys(monitoring_agent):
+    """Test that unknown metric types and resolutions are rejected without being cached"""
+    message = MagicMock()
+    for params in ({'type': 'bogus'}, {'type': 'cpu', 'resolution': '7d'}):
+        await monitoring_agent._cmd_get_metrics(message, params)
+        response = monitoring_agent.send_message.call_args[0][1]
+        assert response.status == "error"
+
+    assert monitoring_agent._metrics_view_cache == {}
+
 @pytest.mark.asyncio
 async def test_handle_set_threshold_command(monitoring_agent):
     """Test handling of set_threshold command"""
@@ -278,8 +323,9 @@ async def test_trigger_alert(monitoring_agent):
         'timestamp': datetime.utcnow().isoformat()
     }
     
-    # Trigger an alert
-    await monitoring_agent._trigger_alert(alert_type, message, details)
+    # Trigger an alert and deliver it
+    monitoring_agent._trigger_alert(alert_type, message, details)
+    await monitoring_agent._flush_alert_queue()
     
     # Check that a broadcast was sent
     monitoring_agent.broadcast.assert_called_once()
@@ -292,6 +338,34 @@ async def test_trigger_alert(monitoring_agent):
     assert message in kwargs['message']
     assert kwargs['details'] == details
 
+@pytest.mark.asyncio
+async def test_trigger_alert_cooldown(monitoring_agent):
+    """Test that an active alert is not re-broadcast until it is cleared"""
+    details = {'value': 95.5, 'threshold': 90.0}
+    
+    monitoring_agent._trigger_alert("high_cpu_usage", "CPU high", details)
+    monitoring_agent._trigger_alert("high_cpu_usage", "CPU high", details)
+    await monitoring_agent._flush_alert_queue()
+    assert monitoring_agent.broadcast.call_count == 1
+    
+    # Dropping below the hysteresis band re-arms the alert
+    await monitoring_agent._check_thresholds({'cpu': {'cpu_percent': 10.0}})
+    monitoring_agent._trigger_alert("high_cpu_usage", "CPU high", details)
+    await monitoring_agent._flush_alert_queue()
+    assert monitoring_agent.broadcast.call_count == 2
+
+@pytest.mark.asyncio
+async def test_alerts_are_batched(monitoring_agent):
+    """Test that alerts queued together are broadcast as one message"""
+    monitoring_agent._trigger_alert("high_cpu_usage", "CPU high", {'value': 95.0})
+    monitoring_agent._trigger_alert("high_memory_usage", "Memory high", {'value': 90.0})
+    await monitoring_agent._flush_alert_queue()
+    
+    monitoring_agent.broadcast.assert_called_once()
+    _, kwargs = monitoring_agent.broadcast.call_args
+    assert kwargs['message_type'] == MessageType.ALERT
+    assert [a['alert_type'] for a in kwargs['alerts']] == ['high_cpu_usage', 'high_memory_usage']
+
 @pytest.mark.asyncio
 async def test_check_thresholds(monitoring_agent):
     """Test threshold checking functionality"""
@@ -306,7 +380,7 @@ async def test_check_thresholds(monitoring_agent):
     test_metrics = {
         'cpu': {'cpu_percent': 95.5},
         'memory': {'percent': 90.0},
-        'disk': {'mountpoint': '/', 'percent': 96.0}
+        'disk': [{'mountpoint': '/', 'percent': 96.0}]
     }
     
     # Mock the _trigger_alert method
@@ -356,7 +430,7 @@ async def test_get_status(monitoring_agent):
     # Add some test metrics
     monitoring_agent.metrics_history['cpu'] = [{'timestamp': '2023-01-01T00:00:00', 'value': 25.0}]
     monitoring_agent.metrics_history['memory'] = [{'timestamp': '2023-01-01T00:00:00', 'value': 60.0}]
-    monitoring_agent.last_metrics_update = datetime.utcnow()
+    monitoring_agent.last_metrics_update_ns = time.time_ns()
     
     # Get the status
     status = await monitoring_agent.get_status()
@@ -372,6 +446,15 @@ async def test_get_status(monitoring_agent):
     assert 'cpu_usage' in status
     assert 'memory_usage_mb' in status
 
+@pytest.mark.asyncio
+async def test_status_json_awaits_async_get_status(monitoring_agent):
+    """status_json must serialize the awaited status of agents with an async get_status"""
+    data = orjson.loads(await monitoring_agent.status_json())
+    
+    assert data['agent_id'] == str(monitoring_agent.id)
+    assert data['name'] == "TestMonitor"
+    assert 'metrics_collected' in data
+
 @pytest.mark.asyncio
 async def test_stop_method(monitoring_agent):
     """Test the stop method"""
@@ -387,5 +470,17 @@ async def test_stop_method(monitoring_agent):
     # Verify that the base stop method was called
     assert not monitoring_agent.running
 
+@pytest.mark.asyncio
+async def test_stop_flushes_alerts_before_shutdown_broadcast(monitoring_agent):
+    """Queued alerts must be broadcast before the shutdown notification"""
+    monitoring_agent.running = True
+    monitoring_agent._trigger_alert("high_cpu_usage", "CPU high", {'value': 99.0})
+
+    await monitoring_agent.stop()
+
+    calls = monitoring_agent.broadcast.call_args_list
+    assert calls[0].kwargs['message_type'] == MessageType.ALERT
+    assert calls[-1].args[0].endswith("is shutting down")
+
 if __name__ == "__main__":
     pytest.main(["-v", "test_monitoring_agent.py"])
@@ -0,0 +1,44 @@
+import asyncio
+import pytest
+from unittest.mock import MagicMock, patch
+from uuid import uuid4
+
+from ..messaging import rabbitmq_client
+from ..messaging.rabbitmq_client import RabbitMQClient
+from ..schemas.messages import Message, MessageHeader, MessagePayload, MessageType
+
+@pytest.fixture
+def test_message():
+    """Create a minimal valid message for publishing"""
+    return Message(
+        header=MessageHeader(
+            message_type=MessageType.COMMAND,
+            source_agent_id=uuid4()
+        ),
+        payload=MessagePayload()
+    )
+
+@pytest.mark.asyncio
+async def test_close_releases_in_flight_publishes(test_message):
+    """Publishes whose batch is being sent when close() runs must resolve to False"""
+    client = RabbitMQClient()
+    client._connected = True
+
+    publish_started = asyncio.Event()
+
+    async def stalled_publish(*args, **kwargs):
+        publish_started.set()
+        await asyncio.Event().wait()  # never completes
+
+    client.exchange = MagicMock()
+    client.exchange.publish = stalled_publish
+
+    with patch.object(rabbitmq_client, 'aio_pika', MagicMock()):
+        pending = [asyncio.create_task(client.publish(test_message)) for _ in range(3)]
+        await asyncio.wait_for(publish_started.wait(), timeout=1)
+
+        await client.close()
+
+        results = await asyncio.wait_for(asyncio.gather(*pending), timeout=1)
+
+    assert results == [False, False, False]
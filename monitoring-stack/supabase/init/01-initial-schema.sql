@@ -259,6 +259,41 @@ AS $$
         p_limit;
 $$;
 
+-- Create a function to get bucketed statistics for a metric
+CREATE OR REPLACE FUNCTION public.agent_metric_stats(
+    p_name TEXT,
+    p_start TIMESTAMPTZ,
+    p_end TIMESTAMPTZ,
+    p_interval INTERVAL DEFAULT INTERVAL '5 minutes'
+)
+RETURNS TABLE (
+    bucket TIMESTAMPTZ,
+    avg_value FLOAT,
+    min_value FLOAT,
+    max_value FLOAT,
+    sample_count BIGINT
+)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT 
+        time_bucket_gapfill(p_interval, timestamp, p_start, p_end) AS bucket,
+        avg(value) AS avg_value,
+        min(value) AS min_value,
+        max(value) AS max_value,
+        count(*) AS sample_count
+    FROM 
+        public.agent_metrics
+    WHERE 
+        name = p_name
+        AND timestamp >= p_start
+        AND timestamp <= p_end
+    GROUP BY 
+        bucket
+    ORDER BY 
+        bucket;
+$$;
+
 -- Create a function to get resource utilization
 CREATE OR REPLACE FUNCTION public.get_resource_utilization(
     p_resource_type TEXT DEFAULT NULL
@@ -293,3 +328,23 @@ AS $$
     HAVING 
         ar.type IS NOT NULL OR p_resource_type IS NULL;
 $$;
+
+-- Create a function to total resource capacity per type in one pass
+CREATE OR REPLACE FUNCTION public.agent_resource_totals()
+RETURNS TABLE (
+    resource_type TEXT,
+    used FLOAT,
+    total FLOAT
+)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT 
+        type::TEXT AS resource_type,
+        COALESCE(SUM(capacity) FILTER (WHERE NOT is_available), 0) AS used,
+        COALESCE(SUM(capacity) FILTER (WHERE is_available), 0) AS total
+    FROM 
+        public.agent_resources
+    GROUP BY 
+        type;
+$$;